@@ -19,7 +19,7 @@ __all__ = [
 
 
 class AioTxBSCClient(AioTxEVMClient):
-    def __init__(self, node_url: str, headers: dict = {}):
+    def __init__(self, node_url: str | list[str], headers: dict = {}):
         super().__init__(node_url, headers)
         bep20_abi_json = pkg_resources.resource_string("aiotx.utils", "bep20_abi.json")
         self._bep20_abi = json.loads(bep20_abi_json)
@@ -29,7 +29,7 @@ class AioTxBSCClient(AioTxEVMClient):
 
 
 class AioTxETHClient(AioTxEVMClient):
-    def __init__(self, node_url: str, headers: dict = {}):
+    def __init__(self, node_url: str | list[str], headers: dict = {}):
         super().__init__(node_url, headers)
         erc20_abi_json = pkg_resources.resource_string("aiotx.utils", "erc20_abi.json")
         self._erc20_abi = json.loads(erc20_abi_json)
@@ -39,7 +39,7 @@ class AioTxETHClient(AioTxEVMClient):
 
 
 class AioTxPolygonClient(AioTxEVMClient):
-    def __init__(self, node_url: str, headers: dict = {}):
+    def __init__(self, node_url: str | list[str], headers: dict = {}):
         super().__init__(node_url, headers)
         erc20_abi_json = pkg_resources.resource_string("aiotx.utils", "erc20_abi.json")
         self._erc20_abi = json.loads(erc20_abi_json)
@@ -51,7 +51,7 @@ class AioTxPolygonClient(AioTxEVMClient):
 class AioTxBTCClient(AioTxUTXOClient):
     def __init__(
         self,
-        node_url,
+        node_url: str | list[str],
         headers: dict = {},
         testnet=False,
         node_username: str = "",
@@ -73,7 +73,7 @@ class AioTxBTCClient(AioTxUTXOClient):
 class AioTxLTCClient(AioTxUTXOClient):
     def __init__(
         self,
-        node_url,
+        node_url: str | list[str],
         headers: dict = {},
         testnet=False,
         node_username: str = "",
@@ -1,13 +1,20 @@
 import asyncio
+import logging
 import os
 import signal
+import time
+from collections import deque
 from contextlib import suppress
-from typing import List, Optional
+from typing import ClassVar, List, Optional
 
 import aiohttp
 
+from aiotx.clients._endpoint_pool import EndpointPool
+from aiotx.clients._ttl_cache import TTLCache
 from aiotx.exceptions import BlockNotFoundError, RpcConnectionError
 from aiotx.log import logger
+from aiotx.utils.checkpoint_store import CheckpointStore
+from aiotx.utils.json_decoder import loads
 
 
 class NotConnectedError(Exception):
@@ -17,7 +24,19 @@ class NotConnectedError(Exception):
 
 
 class AioTxClient:
-    def __init__(self, node_url: str, headers: dict = {}):
+    # Bigger responses are decoded in a thread to keep the event loop responsive
+    json_thread_threshold: int = 1024 * 1024
+    # Method name -> seconds its result is reused by _cached, None forever, 0 not cached
+    default_cache_ttl: ClassVar[dict[str, float | None]] = {}
+
+    def __init__(self, node_url: str | list[str], headers: dict = {}):
+        self.endpoint_pool: EndpointPool | None = None
+        if not isinstance(node_url, str):
+            if not node_url:
+                raise ValueError("At least one node url should be provided")
+            if len(node_url) > 1:
+                self.endpoint_pool = EndpointPool(list(node_url))
+            node_url = node_url[0]
         self.node_url = node_url
         self._headers = headers
         self.monitor: Optional[BlockMonitor] = None
@@ -26,11 +45,56 @@ class AioTxClient:
         self._running_lock = asyncio.Lock()
         self._session: Optional[aiohttp.ClientSession] = None
         self._connected = False
+        self.cache_ttl = dict(self.default_cache_ttl)
+        self._cache = TTLCache()
+
+    async def _cached(self, method: str, *args):
+        """Call client method through the cache, concurrent misses share one call."""
+        return await self._cache.get(
+            (method, *args),
+            lambda: getattr(self, method)(*args),
+            self.cache_ttl.get(method, 0),
+        )
+
+    def clear_cache(self) -> None:
+        """Drop cached gas prices, fee estimates and chain id."""
+        self._cache.invalidate()
 
-    async def connect(self) -> None:
-        """Establish connection and create session."""
+    async def connect(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        keepalive_timeout: float = 15,
+        ttl_dns_cache: int | None = 10,
+        total_timeout: float | None = 300,
+        connect_timeout: float | None = 30,
+        read_timeout: float | None = None,
+    ) -> None:
+        """
+        Establish connection and create session.
+
+        Args:
+            limit (int): Total number of simultaneous connections in the pool.
+            limit_per_host (int): Number of simultaneous connections to the same host, 0 for no limit.
+            keepalive_timeout (float): How many seconds idle connections are kept open.
+            ttl_dns_cache (int, optional): How many seconds resolved hosts are cached, None to cache forever.
+            total_timeout (float, optional): Timeout for the whole request in seconds, None to disable.
+            connect_timeout (float, optional): Timeout for opening a new connection in seconds.
+            read_timeout (float, optional): Timeout for reading a portion of data from the socket in seconds.
+        """
         if not self._connected:
-            self._session = aiohttp.ClientSession()
+            connector = aiohttp.TCPConnector(
+                limit=limit,
+                limit_per_host=limit_per_host,
+                keepalive_timeout=keepalive_timeout,
+                ttl_dns_cache=ttl_dns_cache,
+            )
+            timeout = aiohttp.ClientTimeout(
+                total=total_timeout,
+                sock_connect=connect_timeout,
+                sock_read=read_timeout,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
             self._connected = True
 
     async def disconnect(self) -> None:
@@ -74,11 +138,23 @@ class AioTxClient:
             raise ValueError(
                 "BlockMonitor instance must be set before starting monitoring"
             )
-        
-        if 'max_retries' in kwargs:
-            self.monitor.max_retries = kwargs['max_retries']
-        if 'retry_delay' in kwargs:
-            self.monitor.retry_delay = kwargs['retry_delay']
+
+        for option in (
+            "max_retries",
+            "retry_delay",
+            "catch_up_window",
+            "handler_concurrency",
+            "keep_address_order",
+            "checkpoint_store",
+            "checkpoint_key",
+            "checkpoint_every_blocks",
+            "checkpoint_interval",
+            "confirmations",
+            "raw_blocks",
+            "match_scripts",
+        ):
+            if option in kwargs:
+                setattr(self.monitor, option, kwargs[option])
 
         async with self._running_lock:
             if self._stop_signal is None:
@@ -133,25 +209,212 @@ class AioTxClient:
         if self._stopped_signal:
             await self._stopped_signal.wait()
 
+    def enable_hedged_reads(
+        self, percentile: float = 0.95, initial_delay: float = 0.5
+    ) -> None:
+        """
+        Send slow idempotent reads to a second node as well and use the first answer.
+
+        The read is duplicated if there is no response after the given percentile
+        of recently observed latencies (initial_delay until enough are collected).
+        Transaction broadcasting is never hedged.
+        """
+        if self.endpoint_pool is None:
+            raise ValueError("Hedged reads need client created with several node urls")
+        self.endpoint_pool.hedge_percentile = percentile
+        self.endpoint_pool.hedge_initial_delay = initial_delay
+
+    def disable_hedged_reads(self) -> None:
+        if self.endpoint_pool is not None:
+            self.endpoint_pool.hedge_percentile = None
+
     async def _make_request(
-        self, method: str, url: str, **kwargs
+        self, method: str, url: str, idempotent: bool = False, **kwargs
     ) -> aiohttp.ClientResponse:
-        """Make HTTP request using the shared session."""
+        """
+        Make HTTP request using the shared session.
+
+        If client has several node urls, request is sent to the healthiest
+        endpoint and fails over to the next one on connection errors.
+        Idempotent requests can be hedged, see enable_hedged_reads.
+        """
         self._check_connection()
-        return await self._session.request(method, url, **kwargs)
+        if self.endpoint_pool is None or not url.startswith(self.node_url):
+            return await self._send_request(method, url, **kwargs)
+
+        path = url[len(self.node_url) :]
+        if idempotent and self.endpoint_pool.hedge_percentile is not None:
+            return await self._make_hedged_request(method, path, **kwargs)
+        return await self._make_pool_request(method, path, [], **kwargs)
+
+    async def _make_hedged_request(
+        self, method: str, path: str, **kwargs
+    ) -> aiohttp.ClientResponse:
+        # Shared list, so the hedged request goes to other endpoint than the first one
+        tried = []
+        first = asyncio.create_task(
+            self._make_pool_request(method, path, tried, **kwargs)
+        )
+        pending = {first}
+        try:
+            done, pending = await asyncio.wait(
+                pending, timeout=self.endpoint_pool.hedge_delay()
+            )
+            if not done and len(tried) < len(self.endpoint_pool):
+                logger.info(f"Hedging slow request {method} {path}")
+                pending.add(
+                    asyncio.create_task(
+                        self._make_pool_request(method, path, tried, **kwargs)
+                    )
+                )
+            error = None
+            while pending or done:
+                if not done:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                responses = [task.result() for task in done if not task.exception()]
+                if responses:
+                    for response in responses[1:]:
+                        response.release()
+                    return responses[0]
+                error = next(iter(done)).exception()
+                done = set()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _make_pool_request(
+        self, method: str, path: str, tried: list, **kwargs
+    ) -> aiohttp.ClientResponse:
+        loop = asyncio.get_running_loop()
+        while True:
+            endpoint = self.endpoint_pool.select(exclude=tried)
+            tried.append(endpoint)
+            has_fallback = len(tried) < len(self.endpoint_pool)
+            started_at = loop.time()
+            try:
+                try:
+                    response = await self._send_request(
+                        method, endpoint.url + path, **kwargs
+                    )
+                except (aiohttp.ClientError, RpcConnectionError) as e:
+                    self.endpoint_pool.record_failure(endpoint)
+                    if not has_fallback:
+                        raise
+                    logger.warning(f"Node {endpoint.url} failed: {e}, trying next one")
+                    continue
+
+                if response.status >= 500 or response.status == 429:
+                    self.endpoint_pool.record_failure(endpoint)
+                    if has_fallback:
+                        logger.warning(
+                            f"Node {endpoint.url} response status {response.status}, trying next one"
+                        )
+                        response.release()
+                        continue
+                    return response
+
+                self.endpoint_pool.record_success(endpoint, loop.time() - started_at)
+                return response
+            finally:
+                # Also after cancellation or unexpected errors, so the endpoint is probed again
+                endpoint.probing = False
+
+    async def _send_request(
+        self, method: str, url: str, **kwargs
+    ) -> aiohttp.ClientResponse:
+        try:
+            return await self._session.request(method, url, **kwargs)
+        # aiohttp raises asyncio.TimeoutError, it's not builtin TimeoutError on Python 3.10
+        except asyncio.TimeoutError as e:  # noqa: UP041
+            raise RpcConnectionError(f"Request to {url} timed out") from e
+
+    async def _read_response(self, response: aiohttp.ClientResponse) -> bytes:
+        # Read timeout can also fire while the body is streamed
+        try:
+            return await response.read()
+        except asyncio.TimeoutError as e:  # noqa: UP041
+            raise RpcConnectionError(
+                f"Reading response from {response.url} timed out"
+            ) from e
+
+    async def _read_body(
+        self, response: aiohttp.ClientResponse, log_message: str
+    ) -> bytes:
+        """Read response body once, it is decoded to text only to be logged."""
+        body = await self._read_response(response)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"{log_message}: {body.decode(errors='replace')}")
+        return body
+
+    async def _decode_json(self, body: bytes, parse_in_thread: bool = False):
+        if parse_in_thread or len(body) >= self.json_thread_threshold:
+            return await asyncio.to_thread(loads, body)
+        return loads(body)
 
 
 class BlockMonitor:
+    # How many transactions are handled concurrently, 1 means one by one
+    handler_concurrency: int = 1
+    # With concurrent handlers keep order of transactions of the same address
+    keep_address_order: bool = False
+    # Progress is saved after this many blocks or seconds, whatever comes first
+    checkpoint_store: CheckpointStore | None = None
+    checkpoint_key: str | None = None
+    checkpoint_every_blocks: int = 100
+    checkpoint_interval: float = 10
+    # How many recent blocks are remembered to detect chain reorganizations
+    reorg_buffer_size: int = 64
+    # Handlers are called when block is this deep, 1 means right away
+    confirmations: int = 1
+
     def __init__(self, client: AioTxClient):
         self.client = client
         self.block_handlers: List[callable] = []
         self.transaction_handlers: List[callable] = []
         self.new_utxo_transaction_handlers: List[callable] = []
         self.block_transactions_handlers: List[callable] = []
+        self.rollback_handlers: list[callable] = []
+        self.seen_block_handlers: list[callable] = []
         self._stop_signal: Optional[asyncio.Event] = None
         self._latest_block: Optional[int] = None
         self.max_retries: Optional[int] = 10
         self.retry_delay: Optional[float] = 0.2
+        self._reset_block_time()
+
+    def _reset_block_time(self):
+        self._network_head: int | None = None
+        self._network_head_seen_at: float | None = None
+        self._block_time: float | None = None  # EWMA of seconds between blocks
+
+    def _observe_network_head(self, network_head: int) -> None:
+        """Track how often network produces blocks, used to back off at head."""
+        now = time.monotonic()
+        if self._network_head is not None and network_head > self._network_head:
+            block_time = (now - self._network_head_seen_at) / (
+                network_head - self._network_head
+            )
+            if self._block_time is None:
+                self._block_time = block_time
+            else:
+                self._block_time += 0.2 * (block_time - self._block_time)
+        if self._network_head is None or network_head > self._network_head:
+            self._network_head = network_head
+            self._network_head_seen_at = now
+
+    def _head_backoff(self, timeout_between_blocks: float) -> float:
+        """
+        Delay before the next poll when monitor is at network head.
+
+        Waits until the next block is expected based on observed block time,
+        but never less than timeout_between_blocks.
+        """
+        if self._block_time is None:
+            return timeout_between_blocks
+        next_block_in = self._network_head_seen_at + self._block_time - time.monotonic()
+        return max(timeout_between_blocks, next_block_in)
 
     def on_block(self, func):
         self.block_handlers.append(func)
@@ -165,10 +428,195 @@ class BlockMonitor:
         self.transaction_handlers.append(func)
         return func
 
+    def on_rollback(self, func):
+        self.rollback_handlers.append(func)
+        return func
+
+    def on_block_seen(self, func):
+        self.seen_block_handlers.append(func)
+        return func
+
     def on_new_utxo_transaction(self, func):
         self.new_utxo_transaction_handlers.append(func)
         return func
 
+    def _checkpoint_state(self) -> dict | None:
+        if self._latest_block is None:
+            return None
+        # Blocks waiting for confirmations are fetched again after restart
+        if self._pending_blocks:
+            return {"block": self._pending_blocks[0][0]}
+        return {"block": self._latest_block}
+
+    def _restore_checkpoint(self, state: dict) -> None:
+        self._latest_block = state["block"]
+
+    def _get_checkpoint_key(self) -> str:
+        return self.checkpoint_key or type(self.client).__name__
+
+    async def _load_checkpoint(self) -> None:
+        """Restore progress from checkpoint_store if start block wasn't given."""
+        self._checkpoint_saved_state = None
+        self._checkpoint_saved_at = time.monotonic()
+        if self.checkpoint_store is None or self._latest_block is not None:
+            return
+        state = await self.checkpoint_store.load(self._get_checkpoint_key())
+        if state is not None:
+            logger.info(f"Monitoring restored from checkpoint {state}")
+            self._restore_checkpoint(state)
+            self._checkpoint_saved_state = state
+
+    async def _save_checkpoint(self, force: bool = False) -> None:
+        """Save progress if enough blocks or time passed since the last save."""
+        # Nothing to save if monitoring wasn't started
+        if self.checkpoint_store is None or not hasattr(self, "_checkpoint_saved_at"):
+            return
+        state = self._checkpoint_state()
+        saved = self._checkpoint_saved_state
+        if state is None or state == saved:
+            return
+        if not force:
+            blocks = self._latest_block - (saved or {}).get("block", self._latest_block)
+            elapsed = time.monotonic() - self._checkpoint_saved_at
+            if (
+                abs(blocks) < self.checkpoint_every_blocks
+                and elapsed < self.checkpoint_interval
+            ):
+                return
+        await self.checkpoint_store.save(self._get_checkpoint_key(), state)
+        self._checkpoint_saved_state = state
+        self._checkpoint_saved_at = time.monotonic()
+
+    async def _get_block_hash(self, block_number: int) -> str:
+        # Should be implemented by subclasses which detect reorganizations
+        raise NotImplementedError(
+            "_get_block_hash method must be implemented by subclasses"
+        )
+
+    async def _check_block_linkage(
+        self, block_number: int, block_hash: str, parent_hash: str
+    ) -> int | None:
+        """
+        Remember the block before processing it.
+
+        If it doesn't extend remembered chain, finds the fork point and returns
+        the first orphaned block number, the block is not remembered then.
+        """
+        recent = self._recent_blocks
+        # Same blocks can be processed again, for example after handler error
+        while recent and recent[-1][0] >= block_number:
+            recent.pop()
+        if recent and recent[-1][0] != block_number - 1:
+            recent.clear()
+        if recent and recent[-1][1] != parent_hash:
+            fork_block = await self._find_fork_block()
+            while recent and recent[-1][0] >= fork_block:
+                recent.pop()
+            logger.warning(
+                f"Chain reorganization detected at block {block_number}, rolling back to {fork_block}"
+            )
+            return fork_block
+        recent.append((block_number, block_hash, parent_hash))
+        return None
+
+    async def _find_fork_block(self) -> int:
+        for block_number, block_hash, _ in reversed(self._recent_blocks):
+            if await self._get_block_hash(block_number) == block_hash:
+                return block_number + 1
+        logger.error(
+            f"Chain reorganization is deeper than {len(self._recent_blocks)} remembered blocks"
+        )
+        return self._recent_blocks[0][0]
+
+    async def _handle_rollback(self, block_number: int) -> None:
+        """Revert everything from block_number and notify rollback handlers."""
+        # Orphaned blocks waiting for confirmations are just dropped
+        while self._pending_blocks and self._pending_blocks[-1][0] >= block_number:
+            self._pending_blocks.pop()
+        await self._rollback(block_number)
+        for handler in self.rollback_handlers:
+            await handler(block_number)
+
+    async def _rollback(self, block_number: int) -> None:
+        self._latest_block = block_number
+
+    async def _deliver_blocks(
+        self, blocks: list[tuple[int, dict]], network_last_block: int
+    ) -> None:
+        """
+        Pass consecutive (block number, block data) to handlers once they have enough confirmations.
+
+        Blocks which are not deep enough yet are kept in memory, on_block_seen
+        handlers are called for them right away.
+        """
+        if self.confirmations <= 1:
+            await self._process_confirmed_blocks(blocks, network_last_block)
+            return
+        for block_number, block_data in blocks:
+            for handler in self.seen_block_handlers:
+                await handler(block_number, block_data)
+            self._pending_blocks.append((block_number, block_data))
+        confirmed = []
+        for block_number, block_data in self._pending_blocks:
+            if network_last_block - block_number + 1 < self.confirmations:
+                break
+            confirmed.append((block_number, block_data))
+        if confirmed:
+            await self._process_confirmed_blocks(confirmed, network_last_block)
+            for _ in confirmed:
+                self._pending_blocks.popleft()
+
+    async def _process_confirmed_blocks(
+        self, blocks: list[tuple[int, dict]], network_last_block: int
+    ) -> None:
+        # Should be implemented by subclasses which use _deliver_blocks
+        raise NotImplementedError(
+            "_process_confirmed_blocks method must be implemented by subclasses"
+        )
+
+    def _transaction_order_key(self, transaction):
+        return transaction.get("from")
+
+    async def _dispatch_transactions(self, transactions: list) -> None:
+        """
+        Call transaction handlers for every transaction.
+
+        With handler_concurrency > 1 up to that many transactions are handled
+        at the same time, if keep_address_order is set transactions with the same
+        _transaction_order_key are still handled in block order.
+        Returns after all handlers are finished.
+        """
+        if self.handler_concurrency <= 1:
+            for transaction in transactions:
+                for handler in self.transaction_handlers:
+                    await handler(transaction)
+            return
+
+        semaphore = asyncio.Semaphore(self.handler_concurrency)
+
+        async def handle(queue: list):
+            for transaction in queue:
+                async with semaphore:
+                    for handler in self.transaction_handlers:
+                        await handler(transaction)
+
+        if self.keep_address_order:
+            queues = {}
+            for transaction in transactions:
+                key = self._transaction_order_key(transaction)
+                queues.setdefault(key, []).append(transaction)
+            queues = list(queues.values())
+        else:
+            queues = [[transaction] for transaction in transactions]
+
+        tasks = [asyncio.create_task(handle(queue)) for queue in queues]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
     async def _make_request_with_retry(self, request_func, *args, **kwargs):
         """Make a request with retry logic."""
         for attempt in range(self.max_retries):
@@ -192,11 +640,20 @@ class BlockMonitor:
     ):
         self._stop_signal = asyncio.Event()
         self._latest_block = monitoring_start_block
+        self._reset_block_time()
+        # (block number, hash, parent hash) of recently processed blocks
+        self._recent_blocks = deque(maxlen=self.reorg_buffer_size)
+        # (block number, block data) waiting for confirmations
+        self._pending_blocks = deque()
+        await self._load_checkpoint()
 
         while not self._stop_signal.is_set():
             try:
-                await self.poll_blocks(timeout_between_blocks)
-                await asyncio.sleep(timeout_between_blocks)
+                lag = await self.poll_blocks(timeout_between_blocks)
+                await self._save_checkpoint()
+                # Monitor is behind network head, continue without waiting
+                if not lag:
+                    await asyncio.sleep(self._head_backoff(timeout_between_blocks))
             except asyncio.CancelledError:
                 break
             except Exception as e:
@@ -204,8 +661,9 @@ class BlockMonitor:
                 self._stop_signal.set()
                 raise
 
-    async def poll_blocks(self, timeout: int, **kwargs):
-        # This method should be implemented by subclasses
+    async def poll_blocks(self, timeout: int, **kwargs) -> int | None:
+        # This method should be implemented by subclasses,
+        # returns how many blocks monitor is behind network head
         raise NotImplementedError(
             "poll_blocks method must be implemented by subclasses"
         )
@@ -217,4 +675,4 @@ class BlockMonitor:
         )
 
     async def shutdown(self, **kwargs):
-        pass
+        await self._save_checkpoint(force=True)
@@ -0,0 +1,112 @@
+import time
+from collections import deque
+from collections.abc import Iterable
+
+
+class Endpoint:
+    def __init__(self, url: str):
+        self.url = url
+        self.latency: float | None = None  # EWMA of response time in seconds
+        self.error_rate = 0.0  # EWMA of failed requests share
+        self.consecutive_errors = 0
+        self.ejected_until: float | None = None
+        self.probing = False
+
+    def __repr__(self):
+        return (
+            f"Endpoint({self.url!r}, latency={self.latency}, "
+            f"error_rate={self.error_rate:.2f}, ejected_until={self.ejected_until})"
+        )
+
+
+class EndpointPool:
+    """
+    Keeps health statistics for several node URLs and picks the best one for every request.
+
+    Endpoints are scored by EWMA latency weighted by EWMA error rate. After
+    max_consecutive_errors failures in a row endpoint is ejected for eject_time
+    seconds, after that a single request is let through to probe it again:
+    success brings it back, failure ejects it again.
+    """
+
+    def __init__(
+        self,
+        urls: list[str],
+        ewma_alpha: float = 0.3,
+        max_consecutive_errors: int = 3,
+        eject_time: float = 30,
+    ):
+        if not urls:
+            raise ValueError("At least one node url should be provided")
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.ewma_alpha = ewma_alpha
+        self.max_consecutive_errors = max_consecutive_errors
+        self.eject_time = eject_time
+        # Hedged reads are disabled while hedge_percentile is None
+        self.hedge_percentile: float | None = None
+        self.hedge_initial_delay = 0.5
+        self.hedge_min_delay = 0.01
+        self._latencies: deque[float] = deque(maxlen=200)
+
+    def __len__(self):
+        return len(self.endpoints)
+
+    def score(self, endpoint: Endpoint) -> float:
+        # Endpoints without measurements yet are tried first to get their latency
+        if endpoint.latency is None:
+            return 0.0
+        return endpoint.latency * (1 + 10 * endpoint.error_rate)
+
+    def is_available(self, endpoint: Endpoint, now: float | None = None) -> bool:
+        if endpoint.ejected_until is None:
+            return True
+        if now is None:
+            now = time.monotonic()
+        # Only one probe request at a time for ejected endpoint
+        return endpoint.ejected_until <= now and not endpoint.probing
+
+    def select(self, exclude: Iterable[Endpoint] = ()) -> Endpoint:
+        exclude = set(exclude)
+        now = time.monotonic()
+        candidates = [
+            endpoint
+            for endpoint in self.endpoints
+            if endpoint not in exclude and self.is_available(endpoint, now)
+        ]
+        if not candidates:
+            # Everything is ejected, use the one which should recover first
+            candidates = [
+                endpoint for endpoint in self.endpoints if endpoint not in exclude
+            ] or self.endpoints
+            endpoint = min(candidates, key=lambda e: e.ejected_until or 0)
+        else:
+            endpoint = min(candidates, key=self.score)
+        if endpoint.ejected_until is not None:
+            endpoint.probing = True
+        return endpoint
+
+    def hedge_delay(self) -> float:
+        """How long to wait for the first response before sending the same read to another endpoint."""
+        if len(self._latencies) < 20:
+            return self.hedge_initial_delay
+        latencies = sorted(self._latencies)
+        index = min(int(len(latencies) * self.hedge_percentile), len(latencies) - 1)
+        return max(latencies[index], self.hedge_min_delay)
+
+    def record_success(self, endpoint: Endpoint, latency: float) -> None:
+        self._latencies.append(latency)
+        if endpoint.latency is None:
+            endpoint.latency = latency
+        else:
+            endpoint.latency += self.ewma_alpha * (latency - endpoint.latency)
+        endpoint.error_rate -= self.ewma_alpha * endpoint.error_rate
+        endpoint.consecutive_errors = 0
+        endpoint.ejected_until = None
+        endpoint.probing = False
+
+    def record_failure(self, endpoint: Endpoint) -> None:
+        endpoint.error_rate += self.ewma_alpha * (1 - endpoint.error_rate)
+        endpoint.consecutive_errors += 1
+        endpoint.probing = False
+        if endpoint.consecutive_errors >= self.max_consecutive_errors:
+            endpoint.ejected_until = time.monotonic() + self.eject_time
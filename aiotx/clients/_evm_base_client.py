@@ -1,11 +1,18 @@
+import asyncio
 import binascii
 import decimal
 import json
 import secrets
 import sys
-from typing import Union
+from concurrent.futures import Executor
+from contextlib import suppress
+from typing import ClassVar, Union
+
+import aiohttp
 
 from aiotx.clients._base_client import AioTxClient, BlockMonitor
+from aiotx.clients._nonce_manager import NonceManager
+from aiotx.clients._rpc_coalescer import RpcCoalescer
 from aiotx.exceptions import (
     AioTxError,
     BlockNotFoundError,
@@ -30,10 +37,25 @@ from aiotx.exceptions import (
 )
 from aiotx.log import logger
 from aiotx.types import BlockParam
+from aiotx.utils.bloom_filter import BloomFilter
+
+# Never hedged or retried on other nodes speculatively
+WRITE_RPC_METHODS = frozenset({"eth_sendRawTransaction", "eth_sendTransaction"})
+
+
+def _sign_transactions(transactions: list[dict], private_key: str) -> list[str]:
+    # Module level to be picklable for ProcessPoolExecutor
+    from eth_account import Account
+    from eth_utils import to_hex
+
+    return [
+        to_hex(Account.sign_transaction(transaction, private_key).raw_transaction)
+        for transaction in transactions
+    ]
 
 
 class AioTxEVMBaseClient(AioTxClient):
-    def __init__(self, node_url: str, headers: dict):
+    def __init__(self, node_url: str | list[str], headers: dict):
         try:
             import eth_abi  # noqa: F401
             import eth_account  # noqa: F401
@@ -135,16 +157,28 @@ class AioTxEVMBaseClient(AioTxClient):
     async def get_balance(
         self, address, block_parameter: BlockParam = BlockParam.LATEST
     ) -> int:
-        payload = {
-            "method": "eth_getBalance",
-            "params": [address, block_parameter.value],
-        }
+        payload = self._get_balance_payload(address, block_parameter)
         balance = await self._make_rpc_call(payload)
-        return 0 if balance == "0x" else int(balance, 16)
+        return self._hex_to_int(balance)
 
     async def get_contract_balance(
         self, address, contract_address, block_parameter: BlockParam = BlockParam.LATEST
     ) -> int:
+        payload = self._get_contract_balance_payload(
+            address, contract_address, block_parameter
+        )
+        balance = await self._make_rpc_call(payload)
+        return self._hex_to_int(balance)
+
+    def _get_balance_payload(self, address, block_parameter: BlockParam) -> dict:
+        return {
+            "method": "eth_getBalance",
+            "params": [address, block_parameter.value],
+        }
+
+    def _get_contract_balance_payload(
+        self, address, contract_address, block_parameter: BlockParam
+    ) -> dict:
         from eth_utils import (
             keccak,
         )
@@ -155,13 +189,14 @@ class AioTxEVMBaseClient(AioTxClient):
         padded_address = address.lower().replace("0x", "").zfill(64)
         data = f"0x{method_id}{padded_address}"
 
-        payload = {
+        return {
             "method": "eth_call",
             "params": [{"to": contract_address, "data": data}, block_parameter.value],
         }
 
-        balance = await self._make_rpc_call(payload)
-        return 0 if balance == "0x" else int(balance, 16)
+    @staticmethod
+    def _hex_to_int(value: str) -> int:
+        return 0 if value == "0x" else int(value, 16)
 
     async def get_contract_decimals(self, contract_address) -> int:
         from eth_utils import keccak
@@ -191,11 +226,58 @@ class AioTxEVMBaseClient(AioTxClient):
 
 
 class AioTxEVMClient(AioTxEVMBaseClient):
+    # Chain id never changes, gas price is reused for a few seconds
+    default_cache_ttl: ClassVar[dict[str, float | None]] = {
+        "get_chain_id": None,
+        "get_gas_price": 3,
+    }
+
     def __init__(self, node_url, headers):
         super().__init__(node_url, headers)
         self.chain_id = None
         self.monitor = EvmMonitor(self)
         self._monitoring_task = None
+        self.max_batch_size = 100
+        self._coalescer: RpcCoalescer | None = None
+        self.nonce_manager: NonceManager | None = None
+
+    def enable_request_coalescing(
+        self, max_batch_size: int | None = None, max_delay: float = 0.005
+    ) -> None:
+        """
+        Send RPC calls made concurrently from different coroutines as JSON-RPC batches.
+
+        Calls issued within max_delay seconds (or until max_batch_size calls are
+        collected) are sent together, each caller still gets its own result.
+        """
+        if max_batch_size is None:
+            max_batch_size = self.max_batch_size
+        self._coalescer = RpcCoalescer(
+            lambda payloads: self._make_batch_rpc_call(
+                payloads, return_exceptions=True
+            ),
+            max_batch_size,
+            max_delay,
+        )
+
+    def disable_request_coalescing(self) -> None:
+        self._coalescer = None
+
+    def enable_nonce_manager(self) -> None:
+        """
+        Allocate nonces for send and send_token locally instead of requesting them every time.
+
+        Pending transaction count of a sender is requested once, concurrent sends from
+        the same address get consecutive nonces. Use it only if transactions from these
+        addresses are sent by this client alone, or call nonce_manager.resync() after
+        sending from elsewhere.
+        """
+        self.nonce_manager = NonceManager(
+            lambda address: self.get_transactions_count(address, BlockParam.PENDING)
+        )
+
+    def disable_nonce_manager(self) -> None:
+        self.nonce_manager = None
 
     def generate_address(self):
         from eth_account import Account
@@ -261,22 +343,15 @@ class AioTxEVMClient(AioTxEVMBaseClient):
         gas_price: int = None,
         gas_limit: int = 21000,
     ) -> str:
-        from eth_account import Account
-        from eth_utils import (
-            to_checksum_address,
-            to_hex,
-        )
+        from eth_utils import to_checksum_address
 
         if gas_price is None:
-            gas_price = await self.get_gas_price()
+            gas_price = await self._cached("get_gas_price")
 
         from_address = self.get_address_from_private_key(private_key)
-        if nonce is None:
-            nonce = await self.get_transactions_count(from_address, BlockParam.PENDING)
         if self.chain_id is None:
-            self.chain_id = await self.get_chain_id()
+            self.chain_id = await self._cached("get_chain_id")
         transaction = {
-            "nonce": nonce,
             "gasPrice": gas_price,
             "gas": gas_limit,
             "to": to_checksum_address(to_address),
@@ -284,11 +359,9 @@ class AioTxEVMClient(AioTxEVMBaseClient):
             "data": b"",
             "chainId": self.chain_id,
         }
-        signed_transaction = Account.sign_transaction(transaction, private_key)
-        raw_tx = to_hex(signed_transaction.raw_transaction)
-        payload = {"method": "eth_sendRawTransaction", "params": [raw_tx]}
-        result = await self._make_rpc_call(payload)
-        return result
+        return await self._send_transaction(
+            private_key, from_address, transaction, nonce
+        )
 
     async def send_token(
         self,
@@ -300,67 +373,390 @@ class AioTxEVMClient(AioTxEVMBaseClient):
         gas_price: int = None,
         gas_limit: int = 100000,
     ) -> str:
-        from eth_abi import encode
-        from eth_account import Account
-        from eth_utils import (
-            keccak,
-            to_checksum_address,
-            to_hex,
-        )
+        from eth_utils import to_checksum_address
 
         from_address = self.get_address_from_private_key(private_key)
-        if nonce is None:
-            nonce = await self.get_transactions_count(from_address, BlockParam.PENDING)
         if gas_price is None:
-            gas_price = await self.get_gas_price()
+            gas_price = await self._cached("get_gas_price")
         if self.chain_id is None:
-            self.chain_id = await self.get_chain_id()
-        function_signature = "transfer(address,uint256)"
-        function_selector = keccak(function_signature.encode("utf-8"))[:4].hex()
-        transfer_data = encode(
-            ["address", "uint256"], [to_checksum_address(to_address), amount]
-        )
-        data = "0x" + function_selector + transfer_data.hex()
-
+            self.chain_id = await self._cached("get_chain_id")
         transaction = {
-            "nonce": nonce,
             "gasPrice": gas_price,
             "gas": gas_limit,
             "to": to_checksum_address(contract_address),
             "value": 0,
-            "data": data,
+            "data": self._get_transfer_data(to_address, amount),
             "chainId": self.chain_id,
         }
+        return await self._send_transaction(
+            private_key, from_address, transaction, nonce
+        )
+
+    def _get_transfer_data(self, to_address: str, amount: int) -> str:
+        from eth_abi import encode
+        from eth_utils import keccak, to_checksum_address
+
+        function_signature = "transfer(address,uint256)"
+        function_selector = keccak(function_signature.encode("utf-8"))[:4].hex()
+        transfer_data = encode(
+            ["address", "uint256"], [to_checksum_address(to_address), amount]
+        )
+        return "0x" + function_selector + transfer_data.hex()
 
-        signed_transaction = Account.sign_transaction(transaction, private_key)
-        raw_tx = to_hex(signed_transaction.raw_transaction)
+    async def send_bulk(
+        self,
+        private_key: str,
+        destinations: list[tuple[str, int]],
+        gas_price: int | None = None,
+        gas_limit: int = 21000,
+        executor: Executor | None = None,
+    ) -> list[str | AioTxError]:
+        """
+        Send amounts to (to_address, amount) destinations, one transaction each.
+
+        Returns transaction hash or the error for every destination in the same order.
+        """
+        from eth_utils import to_checksum_address
+
+        transactions = [
+            {
+                "gas": gas_limit,
+                "to": to_checksum_address(to_address),
+                "value": amount,
+                "data": b"",
+            }
+            for to_address, amount in destinations
+        ]
+        return await self._send_transactions_bulk(
+            private_key, transactions, gas_price, executor
+        )
 
+    async def send_token_bulk(
+        self,
+        private_key: str,
+        contract_address: str,
+        destinations: list[tuple[str, int]],
+        gas_price: int | None = None,
+        gas_limit: int = 100000,
+        executor: Executor | None = None,
+    ) -> list[str | AioTxError]:
+        """
+        Send token amounts to (to_address, amount) destinations, one transaction each.
+
+        Returns transaction hash or the error for every destination in the same order.
+        """
+        from eth_utils import to_checksum_address
+
+        contract_address = to_checksum_address(contract_address)
+        transactions = [
+            {
+                "gas": gas_limit,
+                "to": contract_address,
+                "value": 0,
+                "data": self._get_transfer_data(to_address, amount),
+            }
+            for to_address, amount in destinations
+        ]
+        return await self._send_transactions_bulk(
+            private_key, transactions, gas_price, executor
+        )
+
+    async def _send_transactions_bulk(
+        self,
+        private_key: str,
+        transactions: list[dict],
+        gas_price: int | None,
+        executor: Executor | None,
+    ) -> list[str | AioTxError]:
+        if not transactions:
+            return []
+        # Shared by all transactions, requested once
+        from_address = self.get_address_from_private_key(private_key)
+        if gas_price is None:
+            gas_price = await self._cached("get_gas_price")
+        if self.chain_id is None:
+            self.chain_id = await self._cached("get_chain_id")
+        if self.nonce_manager is not None:
+            acquired = [
+                await self.nonce_manager.acquire(from_address) for _ in transactions
+            ]
+            nonces = [nonce for nonce, _ in acquired]
+        else:
+            first_nonce = await self.get_transactions_count(
+                from_address, BlockParam.PENDING
+            )
+            nonces = range(first_nonce, first_nonce + len(transactions))
+        transactions = [
+            {
+                **transaction,
+                "gasPrice": gas_price,
+                "chainId": self.chain_id,
+                "nonce": nonce,
+            }
+            for transaction, nonce in zip(transactions, nonces)
+        ]
+
+        # Signing is CPU-bound, chunks are signed in parallel in the executor
+        loop = asyncio.get_running_loop()
+        chunks = [
+            transactions[i : i + self.max_batch_size]
+            for i in range(0, len(transactions), self.max_batch_size)
+        ]
+        try:
+            signed_chunks = await asyncio.gather(
+                *[
+                    loop.run_in_executor(
+                        executor, _sign_transactions, chunk, private_key
+                    )
+                    for chunk in chunks
+                ]
+            )
+        except BaseException:
+            if self.nonce_manager is not None:
+                for nonce, generation in acquired:
+                    self.nonce_manager.release(from_address, nonce, generation)
+            raise
+
+        try:
+            results = await self._make_batch_rpc_call(
+                [
+                    {"method": "eth_sendRawTransaction", "params": [raw_tx]}
+                    for signed_chunk in signed_chunks
+                    for raw_tx in signed_chunk
+                ],
+                return_exceptions=True,
+            )
+        except BaseException:
+            if self.nonce_manager is not None:
+                # Some of transactions may be already broadcast
+                self.nonce_manager.resync(from_address)
+            raise
+
+        if self.nonce_manager is not None:
+            # Chunk which failed to respond may be already broadcast
+            if any(
+                isinstance(
+                    result,
+                    (
+                        NonceTooLowError,
+                        ReplacementTransactionUnderpriced,
+                        RpcConnectionError,
+                    ),
+                )
+                for result in results
+            ):
+                self.nonce_manager.resync(from_address)
+            else:
+                for (nonce, generation), result in zip(acquired, results):
+                    if isinstance(result, AioTxError):
+                        self.nonce_manager.release(from_address, nonce, generation)
+        return results
+
+    async def _send_transaction(
+        self,
+        private_key: str,
+        from_address: str,
+        transaction: dict,
+        nonce: int | None,
+    ) -> str:
+        if nonce is not None or self.nonce_manager is None:
+            if nonce is None:
+                nonce = await self.get_transactions_count(
+                    from_address, BlockParam.PENDING
+                )
+            return await self._sign_and_send(
+                {**transaction, "nonce": nonce}, private_key
+            )
+
+        nonce, generation = await self.nonce_manager.acquire(from_address)
+        try:
+            return await self._sign_and_send(
+                {**transaction, "nonce": nonce}, private_key
+            )
+        except (NonceTooLowError, ReplacementTransactionUnderpriced):
+            # Nonce was used outside of this client, local state is stale
+            self.nonce_manager.resync(from_address)
+            raise
+        except BaseException:
+            # Transaction wasn't accepted, nonce is given to the next one
+            self.nonce_manager.release(from_address, nonce, generation)
+            raise
+
+    async def _sign_and_send(self, transaction: dict, private_key: str) -> str:
+        raw_tx = _sign_transactions([transaction], private_key)[0]
         payload = {"method": "eth_sendRawTransaction", "params": [raw_tx]}
-        result = await self._make_rpc_call(payload)
-        return result
+        return await self._make_rpc_call(payload)
 
     async def get_chain_id(self) -> int:
         payload = {"method": "eth_chainId", "params": []}
         tx_count = await self._make_rpc_call(payload)
         return 0 if tx_count == "0x" else int(tx_count, 16)
 
+    async def get_balances(
+        self, addresses: list[str], block_parameter: BlockParam = BlockParam.LATEST
+    ) -> dict[str, int]:
+        payloads = [
+            self._get_balance_payload(address, block_parameter) for address in addresses
+        ]
+        balances = await self._make_batch_rpc_call(payloads)
+        return {
+            address: self._hex_to_int(balance)
+            for address, balance in zip(addresses, balances)
+        }
+
+    async def get_contract_balances(
+        self,
+        addresses: list[str],
+        contract_address: str,
+        block_parameter: BlockParam = BlockParam.LATEST,
+    ) -> dict[str, int]:
+        payloads = [
+            self._get_contract_balance_payload(
+                address, contract_address, block_parameter
+            )
+            for address in addresses
+        ]
+        balances = await self._make_batch_rpc_call(payloads)
+        return {
+            address: self._hex_to_int(balance)
+            for address, balance in zip(addresses, balances)
+        }
+
+    async def get_blocks_by_numbers(
+        self, block_numbers: list[int], transaction_detail_flag: bool = True
+    ) -> list:
+        payloads = [
+            {
+                "method": "eth_getBlockByNumber",
+                "params": [hex(block_number), transaction_detail_flag],
+            }
+            for block_number in block_numbers
+        ]
+        return await self._make_batch_rpc_call(payloads)
+
+    async def get_transactions_counts(
+        self, addresses: list[str], block_parameter: BlockParam = BlockParam.LATEST
+    ) -> dict[str, int]:
+        payloads = [
+            {
+                "method": "eth_getTransactionCount",
+                "params": [address, block_parameter.value],
+            }
+            for address in addresses
+        ]
+        tx_counts = await self._make_batch_rpc_call(payloads)
+        return {
+            address: self._hex_to_int(tx_count)
+            for address, tx_count in zip(addresses, tx_counts)
+        }
+
     async def _make_rpc_call(self, payload) -> dict:
+        if self._coalescer is not None:
+            return await self._coalescer.call(payload)
+        return await self._make_single_rpc_call(payload)
+
+    async def _make_single_rpc_call(self, payload) -> dict:
         self._check_connection()
         payload["jsonrpc"] = "2.0"
         payload["id"] = 1
         logger.info(f"rpc call payload: {payload}")
 
         response = await self._make_request(
-            "POST", self.node_url, data=json.dumps(payload), headers=self._headers
+            "POST",
+            self.node_url,
+            idempotent=payload["method"] not in WRITE_RPC_METHODS,
+            data=json.dumps(payload),
+            headers=self._headers,
+        )
+
+        body = await self._read_body(response, "rpc call result")
+        if response.status != 200:
+            raise RpcConnectionError(body.decode(errors="replace"))
+
+        result = await self._decode_json(body)
+        return self._process_rpc_result(result)
+
+    async def _make_batch_rpc_call(
+        self, payloads: list[dict], return_exceptions: bool = False
+    ) -> list:
+        """
+        Send payloads as JSON-RPC batches of up to max_batch_size items.
+
+        Results are returned in the same order as payloads. Errors of single items
+        are mapped the same way as in _make_rpc_call, if return_exceptions is True
+        they are returned in place of the result instead of being raised. Then
+        a failed chunk also doesn't hide results of the other chunks, its error
+        is returned for every item of the chunk.
+        """
+        self._check_connection()
+        for request_id, payload in enumerate(payloads):
+            payload["jsonrpc"] = "2.0"
+            payload["id"] = request_id
+
+        chunks = [
+            payloads[i : i + self.max_batch_size]
+            for i in range(0, len(payloads), self.max_batch_size)
+        ]
+        responses = await asyncio.gather(
+            *[self._send_rpc_batch(chunk) for chunk in chunks],
+            return_exceptions=return_exceptions,
         )
 
-        response_text = await response.text()
-        logger.info(f"rpc call result: {response_text}")
+        results_by_id = {}
+        for chunk, response in zip(chunks, responses):
+            if isinstance(response, aiohttp.ClientError):
+                response = RpcConnectionError(f"Batch request failed: {response}")
+            if isinstance(response, AioTxError):
+                for payload in chunk:
+                    results_by_id[payload["id"]] = response
+            elif isinstance(response, BaseException):
+                raise response
+            else:
+                for result in response:
+                    results_by_id[result.get("id")] = result
+
+        results = []
+        for request_id in range(len(payloads)):
+            try:
+                result = results_by_id.get(request_id)
+                if result is None:
+                    raise RpcConnectionError(
+                        f"Node returned no result for batch item {request_id}"
+                    )
+                if isinstance(result, AioTxError):
+                    raise result
+                results.append(self._process_rpc_result(result))
+            except AioTxError as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
+    async def _send_rpc_batch(self, payloads: list[dict]) -> list[dict]:
+        logger.info(f"rpc batch call payload: {payloads}")
 
+        response = await self._make_request(
+            "POST",
+            self.node_url,
+            idempotent=all(
+                payload["method"] not in WRITE_RPC_METHODS for payload in payloads
+            ),
+            data=json.dumps(payloads),
+            headers=self._headers,
+        )
+
+        body = await self._read_body(response, "rpc batch call result")
         if response.status != 200:
-            raise RpcConnectionError(response_text)
+            raise RpcConnectionError(body.decode(errors="replace"))
+
+        result = await self._decode_json(body)
+        if isinstance(result, dict):
+            # Whole batch was rejected, for example node doesn't support batches
+            self._process_rpc_result(result)
+            raise RpcConnectionError(f"Unexpected batch response: {result}")
+        return result
 
-        result = await response.json()
+    def _process_rpc_result(self, result: dict):
         if "error" not in result.keys():
             return result["result"]
 
@@ -425,19 +821,100 @@ class EvmMonitor(BlockMonitor):
         self.block_handlers = []
         self.transaction_handlers = []
         self.block_transactions_handlers = []
+        self.rollback_handlers = []
+        self.seen_block_handlers = []
         self.running = False
         self._latest_block = None
+        # How many blocks are fetched with one batch call while monitor is behind
+        self.catch_up_window = 1
+        self._prefetch: tuple[int, asyncio.Task] | None = None
+        # Only transactions with matching lowercase address go to transaction handlers
+        self.address_filter: BloomFilter | None = None
 
-    async def poll_blocks(self, _: int):
+    async def poll_blocks(self, _: int) -> int:
         network_latest_block = await self.client.get_last_block_number()
+        self._observe_network_head(network_latest_block)
         target_block = (
             network_latest_block if self._latest_block is None else self._latest_block
         )
         if target_block > network_latest_block:
-            return
-        cur_block = await self.client.get_block_by_number(target_block)
-        await self.process_block(cur_block, network_latest_block)
-        self._latest_block = target_block + 1
+            return 0
+        if self.catch_up_window <= 1:
+            blocks = [await self.client.get_block_by_number(target_block)]
+        else:
+            blocks = await self._get_window(target_block, network_latest_block)
+            last_block = target_block + len(blocks) - 1
+            if last_block < network_latest_block:
+                # Fetch next window while handlers are busy with the current one
+                next_task = asyncio.create_task(
+                    self._fetch_window(last_block + 1, network_latest_block)
+                )
+                self._prefetch = (last_block + 1, next_task)
+        for cur_block in blocks:
+            block_number = int(cur_block["number"], 16)
+            fork_block = await self._check_block_linkage(
+                block_number, cur_block["hash"], cur_block["parentHash"]
+            )
+            if fork_block is not None:
+                await self._handle_rollback(fork_block)
+                return network_latest_block - fork_block + 1
+            await self._deliver_blocks(
+                [(block_number, cur_block)], network_latest_block
+            )
+            self._latest_block = block_number + 1
+        return network_latest_block - self._latest_block + 1
+
+    async def _process_confirmed_blocks(self, blocks, network_latest_block):
+        for _, cur_block in blocks:
+            await self.process_block(cur_block, network_latest_block)
+
+    async def _get_block_hash(self, block_number: int) -> str:
+        block = await self.client.get_block_by_number(block_number, False)
+        return block["hash"]
+
+    async def _get_window(self, start_block: int, network_latest_block: int) -> list:
+        if self._prefetch is not None:
+            prefetch_start, task = self._prefetch
+            self._prefetch = None
+            if prefetch_start == start_block:
+                with suppress(Exception):
+                    blocks = await task
+                    if blocks:
+                        return blocks
+            else:
+                task.cancel()
+        blocks = await self._fetch_window(start_block, network_latest_block)
+        if not blocks:
+            raise BlockNotFoundError(f"Block {start_block} not found")
+        return blocks
+
+    async def _fetch_window(self, start_block: int, network_latest_block: int) -> list:
+        last_block = min(start_block + self.catch_up_window - 1, network_latest_block)
+        blocks = await self.client.get_blocks_by_numbers(
+            list(range(start_block, last_block + 1))
+        )
+        # Node can lag behind its own eth_blockNumber, deliver only continuous part
+        for index, block in enumerate(blocks):
+            if block is None:
+                return blocks[:index]
+        return blocks
+
+    async def shutdown(self, **kwargs):
+        if self._prefetch is not None:
+            self._prefetch[1].cancel()
+            self._prefetch = None
+        await super().shutdown(**kwargs)
+
+    def _matches_filter(self, transaction: dict) -> bool:
+        addresses = [transaction.get("from"), transaction.get("to")]
+        # Token recipient is in the decoded input
+        parameters = transaction["aiotx_decoded_input"]["parameters"] or {}
+        addresses.extend(
+            value for value in parameters.values() if isinstance(value, str)
+        )
+        return any(
+            address.lower() in self.address_filter for address in addresses if address
+        )
 
     async def process_block(self, cur_block, network_latest_block):
         for handler in self.block_handlers:
@@ -449,8 +926,10 @@ class EvmMonitor(BlockMonitor):
             transaction["aiotx_decoded_input"] = self.client.decode_transaction_input(
                 transaction["input"]
             )
-            for handler in self.transaction_handlers:
-                await handler(transaction)
+        transactions = cur_block["transactions"]
+        if self.address_filter is not None:
+            transactions = [tx for tx in transactions if self._matches_filter(tx)]
+        await self._dispatch_transactions(transactions)
 
         for handler in self.block_transactions_handlers:
             await handler(cur_block["transactions"])
@@ -0,0 +1,69 @@
+import asyncio
+import heapq
+from collections.abc import Awaitable, Callable
+
+
+class NonceManager:
+    """
+    Hands out transaction nonces per sender address without asking the node every time.
+
+    The first nonce of an address is requested with get_nonce (pending transaction
+    count), after that nonces are allocated locally in increasing order. Nonces of
+    transactions which failed to broadcast are released and given out again first,
+    so no gap is left. After resync the next nonce is requested from the node again.
+
+    Every resync starts a new generation of the address, nonces acquired before it
+    are released with their generation and ignored, they may be in use already.
+    """
+
+    def __init__(self, get_nonce: Callable[[str], Awaitable[int]]):
+        self._get_nonce = get_nonce
+        self._next_nonce: dict[str, int] = {}
+        self._released: dict[str, list[int]] = {}
+        self._generation: dict[str, int] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    async def acquire(self, address: str) -> tuple[int, int]:
+        """Returns the nonce and the generation it was allocated in."""
+        key = address.lower()
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            if key not in self._next_nonce:
+                self._next_nonce[key] = await self._get_nonce(address)
+                self._released[key] = []
+            generation = self._generation.get(key, 0)
+            released = self._released[key]
+            if released:
+                return heapq.heappop(released), generation
+            nonce = self._next_nonce[key]
+            self._next_nonce[key] = nonce + 1
+            return nonce, generation
+
+    def release(self, address: str, nonce: int, generation: int) -> None:
+        """Give back the nonce of a transaction which wasn't broadcast."""
+        address = address.lower()
+        if (
+            generation != self._generation.get(address, 0)
+            or address not in self._next_nonce
+            or nonce >= self._next_nonce[address]
+        ):
+            # Not allocated from the current state, e.g. before resync
+            return
+        released = self._released[address]
+        if nonce in released:
+            return
+        heapq.heappush(released, nonce)
+        # Shrink back while the highest allocated nonces are all released
+        next_nonce = self._next_nonce[address]
+        while next_nonce - 1 in released:
+            released.remove(next_nonce - 1)
+            next_nonce -= 1
+        heapq.heapify(released)
+        self._next_nonce[address] = next_nonce
+
+    def resync(self, address: str | None = None) -> None:
+        """Forget local state of the address (all addresses if None), the node is asked again."""
+        keys = list(self._next_nonce) if address is None else [address.lower()]
+        for key in keys:
+            self._next_nonce.pop(key, None)
+            self._released.pop(key, None)
+            self._generation[key] = self._generation.get(key, 0) + 1
@@ -0,0 +1,71 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+
+from aiotx.log import logger
+
+
+class RpcCoalescer:
+    """
+    Collects RPC payloads issued by concurrent coroutines within a small time
+    window (or until max_batch_size payloads are collected) and sends them as one
+    JSON-RPC batch. Every caller gets its own result or exception back.
+
+    send_batch should return results in the order of payloads and put exceptions
+    in place of results for the failed items.
+    """
+
+    def __init__(
+        self,
+        send_batch: Callable[[list[dict]], Awaitable[list]],
+        max_batch_size: int = 100,
+        max_delay: float = 0.005,
+    ):
+        self._send_batch = send_batch
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._pending: list[tuple[dict, asyncio.Future]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def call(self, payload: dict):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((payload, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_delay, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        task = asyncio.create_task(self._send(pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, pending: list[tuple[dict, asyncio.Future]]) -> None:
+        logger.debug(f"sending {len(pending)} coalesced rpc calls")
+        # Failure of the whole batch is given to every caller
+        (results,) = await asyncio.gather(
+            self._send_batch([payload for payload, _ in pending]),
+            return_exceptions=True,
+        )
+        if isinstance(results, BaseException):
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(results)
+            return
+
+        for (_, future), result in zip(pending, results):
+            # Caller could be already cancelled
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
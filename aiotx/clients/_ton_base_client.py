@@ -21,11 +21,14 @@ from aiotx.utils.tonsdk.utils import Address, bytes_to_b64str
 from aiotx.utils.tonsdk.utils import from_nano as tonsdk_from_nano
 from aiotx.utils.tonsdk.utils import to_nano as tonsdk_to_nano
 
+# Never hedged or retried on other nodes speculatively
+WRITE_RPC_METHODS = frozenset({"sendBoc", "sendBocReturnHash", "sendQuery"})
+
 
 class AioTxTONClient(AioTxClient):
     def __init__(
         self,
-        node_url: str,
+        node_url: str | list[str],
         headers: dict = {},
         wallet_version: WalletVersionEnum = WalletVersionEnum.v4r2,
         workchain: Optional[int] = None,
@@ -372,9 +375,9 @@ class AioTxTONClient(AioTxClient):
         data = json.dumps({"address": address, "method": method, "stack": stack})
 
         response = await self._make_request(
-            "POST", target_url, data=data, headers=headers
+            "POST", target_url, idempotent=True, data=data, headers=headers
         )
-        result = await response.json()
+        result = await self._decode_json(await self._read_response(response))
         if result["ok"]:
             return result["result"]
         else:
@@ -391,13 +394,16 @@ class AioTxTONClient(AioTxClient):
         logger.info(f"rpc call payload: {payload}")
 
         response = await self._make_request(
-            "POST", self.node_url + "/jsonRPC", data=payload_json, headers=headers
+            "POST",
+            self.node_url + "/jsonRPC",
+            idempotent=payload["method"] not in WRITE_RPC_METHODS,
+            data=payload_json,
+            headers=headers,
         )
 
-        response_text = await response.text()
-        logger.info(f"rpc call result: {response_text}")
-
+        body = await self._read_body(response, "rpc call result")
         if response.status != 200:
+            response_text = body.decode(errors="replace")
             if "cannot find block" in response_text:
                 raise BlockNotFoundError(response_text)
             if "Incorrect address" in response_text:
@@ -405,7 +411,7 @@ class AioTxTONClient(AioTxClient):
             raise RpcConnectionError(
                 f"Node response status code: {response.status} response test: {response_text}"
             )
-        result = await response.json()
+        result = await self._decode_json(body)
         return result["result"]
 
 
@@ -421,6 +427,8 @@ class TonMonitor(BlockMonitor):
         self.block_handlers = []
         self.transaction_handlers = []
         self.block_transactions_handlers = []
+        self.rollback_handlers = []
+        self.seen_block_handlers = []
         self.running = False
         self._last_master_block = last_master_block
         self.max_retries = max_retries
@@ -464,10 +472,11 @@ class TonMonitor(BlockMonitor):
         # Update last processed seqno
         self.shard_last_seqno[shard_id] = current_seqno
 
-    async def poll_blocks(self, timeout_between_blocks: int):
+    async def poll_blocks(self, timeout_between_blocks: int) -> int:
         workchain, shard, seqno = await self._make_request_with_retry(
             self.client._get_network_params
         )
+        self._observe_network_head(seqno)
         if self.client.workchain is None:
             self.client.workchain = workchain
 
@@ -477,10 +486,9 @@ class TonMonitor(BlockMonitor):
         # If behind network, process next block
         elif self._latest_block < seqno:
             target_block = self._latest_block + 1
-        # No new blocks, sleep
+        # No new blocks, monitor loop will wait
         else:
-            await asyncio.sleep(timeout_between_blocks)
-            return
+            return 0
 
         shards = await self._make_request_with_retry(
             self.client.get_master_block_shards, target_block
@@ -494,6 +502,7 @@ class TonMonitor(BlockMonitor):
 
         await self.process_master_block(target_block)
         self._latest_block = target_block
+        return seqno - target_block
 
     async def process_master_block(self, block):
         for handler in self.block_handlers:
@@ -503,6 +512,24 @@ class TonMonitor(BlockMonitor):
         for handler in self.block_transactions_handlers:
             await handler(shard_transactions)
 
-        for transaction in shard_transactions:
-            for handler in self.transaction_handlers:
-                await handler(transaction)
+        await self._dispatch_transactions(shard_transactions)
+
+    def _transaction_order_key(self, transaction):
+        return transaction.get("account")
+
+    def _checkpoint_state(self) -> dict | None:
+        if self._latest_block is None:
+            return None
+        return {
+            "block": self._latest_block,
+            "shards": [
+                [workchain, shard, seqno]
+                for (workchain, shard), seqno in self.shard_last_seqno.items()
+            ],
+        }
+
+    def _restore_checkpoint(self, state: dict) -> None:
+        self._latest_block = state["block"]
+        self.shard_last_seqno = {
+            (workchain, shard): seqno for workchain, shard, seqno in state["shards"]
+        }
@@ -27,11 +27,14 @@ units = {
 MIN_SUN = 1
 MAX_SUN = 10**18
 
+# Never hedged or retried on other nodes speculatively
+WRITE_API_PATHS = frozenset({"/wallet/broadcasttransaction", "/wallet/broadcasthex"})
+
 
 class AioTxTRONClient(AioTxEVMBaseClient):
     def __init__(
         self,
-        node_url: str,
+        node_url: str | list[str],
         headers: dict = {},
     ):
         super().__init__(node_url, headers)
@@ -349,22 +352,28 @@ class AioTxTRONClient(AioTxEVMBaseClient):
         if method == "POST":
             payload_json = json.dumps(payload)
             response = await self._make_request(
-                method, url, data=payload_json, headers=headers
+                method,
+                url,
+                idempotent=path not in WRITE_API_PATHS,
+                data=payload_json,
+                headers=headers,
             )
         else:
-            response = await self._make_request(method, url, headers=headers)
+            response = await self._make_request(
+                method, url, idempotent=True, headers=headers
+            )
 
         return await self._process_api_answer(response)
 
     async def _process_api_answer(self, response: aiohttp.ClientResponse) -> dict:
-        response_text = await response.text()
-        logger.info(f"api call result: {response_text} status: {response.status}")
+        body = await self._read_body(
+            response, f"api call status: {response.status} result"
+        )
         if response.status != 200:
             raise RpcConnectionError(
-                f"Node response status code: {response.status} response test: {response_text}"
+                f"Node response status code: {response.status} response test: {body.decode(errors='replace')}"
             )
-        result = await response.json()
-        return result
+        return await self._decode_json(body)
 
     async def _make_rpc_call(self, payload, path="/jsonrpc") -> dict:
         payload["jsonrpc"] = "2.0"
@@ -375,16 +384,19 @@ class AioTxTRONClient(AioTxEVMBaseClient):
         headers.update(self._headers)
 
         response = await self._make_request(
-            "POST", self.node_url + path, data=payload_json, headers=headers
+            "POST",
+            self.node_url + path,
+            idempotent=payload["method"] != "eth_sendRawTransaction",
+            data=payload_json,
+            headers=headers,
         )
 
-        response_text = await response.text()
-        logger.info(f"rpc call result: {response_text}")
+        body = await self._read_body(response, "rpc call result")
         if response.status != 200:
             raise RpcConnectionError(
-                f"Node response status code: {response.status} response test: {response_text}"
+                f"Node response status code: {response.status} response test: {body.decode(errors='replace')}"
             )
-        result = await response.json()
+        result = await self._decode_json(body)
         if "error" not in result.keys():
             return result["result"]
         error_code = result["error"]["code"]
@@ -411,27 +423,47 @@ class TronMonitor(BlockMonitor):
         self.block_handlers = []
         self.transaction_handlers = []
         self.block_transactions_handlers = []
+        self.rollback_handlers = []
+        self.seen_block_handlers = []
         self.running = False
         self._last_block = last_block
         self.max_retries = max_retries
         self.retry_delay = retry_delay
 
-    async def poll_blocks(self, _: int):
+    async def poll_blocks(self, _: int) -> int:
         network_last_block = await self._make_request_with_retry(
             self.client.get_last_block_number
         )
+        self._observe_network_head(network_last_block)
         target_block = (
             network_last_block if self._latest_block is None else self._latest_block
         )
         if target_block > network_last_block:
-            return
+            return 0
         block_data = await self._make_request_with_retry(
             self.client.get_block_by_number,
             target_block,
         )
-        await self.process_transactions(block_data["transactions"])
-        await self.process_block(target_block, network_last_block)
+        fork_block = await self._check_block_linkage(
+            target_block, block_data["hash"], block_data["parentHash"]
+        )
+        if fork_block is not None:
+            await self._handle_rollback(fork_block)
+            return network_last_block - fork_block + 1
+        await self._deliver_blocks([(target_block, block_data)], network_last_block)
         self._latest_block = target_block + 1
+        return network_last_block - target_block
+
+    async def _process_confirmed_blocks(self, blocks, network_last_block):
+        for block_number, block_data in blocks:
+            await self.process_transactions(block_data["transactions"])
+            await self.process_block(block_number, network_last_block)
+
+    async def _get_block_hash(self, block_number: int) -> str:
+        block = await self._make_request_with_retry(
+            self.client.get_block_by_number, block_number, False
+        )
+        return block["hash"]
 
     async def process_block(self, block, network_last_block):
         for handler in self.block_handlers:
@@ -442,7 +474,6 @@ class TronMonitor(BlockMonitor):
             transaction["aiotx_decoded_input"] = self.client.decode_transaction_input(
                 transaction["input"]
             )
-            for handler in self.transaction_handlers:
-                await handler(transaction)
+        await self._dispatch_transactions(transactions)
         for handler in self.block_transactions_handlers:
             await handler(transactions)
@@ -0,0 +1,54 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+
+class TTLCache:
+    """
+    Keeps results of coroutine calls for ttl seconds (None keeps them forever).
+
+    Concurrent misses for the same key share one call: the first caller starts it
+    and the others wait for its result. Failed calls are not cached, every waiter
+    gets the exception.
+    """
+
+    def __init__(self):
+        # key -> (expires at or None, value)
+        self._values: dict[Hashable, tuple[float | None, Any]] = {}
+        self._pending: dict[Hashable, asyncio.Task] = {}
+
+    async def get(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[Any]],
+        ttl: float | None,
+    ) -> Any:
+        if ttl is not None and ttl <= 0:
+            return await factory()
+        entry = self._values.get(key)
+        if entry is not None and (entry[0] is None or entry[0] > time.monotonic()):
+            return entry[1]
+
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._pending[key] = task
+            task.add_done_callback(lambda done: self._store(key, ttl, done))
+        # Cancelled caller doesn't cancel the call other callers are waiting for
+        return await asyncio.shield(task)
+
+    def _store(self, key: Hashable, ttl: float | None, task: asyncio.Task) -> None:
+        self._pending.pop(key, None)
+        # exception() also marks it as retrieved if every caller was cancelled
+        if task.cancelled() or task.exception() is not None:
+            return
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        self._values[key] = (expires_at, task.result())
+
+    def invalidate(self, key: Hashable | None = None) -> None:
+        """Drop cached value of key, or all values if key is None."""
+        if key is None:
+            self._values.clear()
+        else:
+            self._values.pop(key, None)
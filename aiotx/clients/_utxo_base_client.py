@@ -1,8 +1,11 @@
 import asyncio
 import json
+import logging
 import sys
+from collections import deque
+from contextlib import suppress
 from decimal import Decimal
-from typing import Optional, Union
+from typing import ClassVar, Optional, Union
 
 import aiohttp
 from aiohttp.client_exceptions import ClientError, ClientOSError
@@ -18,15 +21,26 @@ from aiotx.exceptions import (
     MethodNotFoundError,
     NotImplementedError,
     RpcConnectionError,
+    UnsupportedTransactionError,
 )
 from aiotx.log import logger
 from aiotx.types import FeeEstimate, UTXOType
+from aiotx.utils.bloom_filter import BloomFilter
+from aiotx.utils.coin_selection import CoinSelection
+from aiotx.utils.raw_block_parser import parse_block
+from aiotx.utils.tx_size import transaction_vsize
+
+# Never hedged or retried on other nodes speculatively
+WRITE_RPC_METHODS = frozenset({"sendrawtransaction"})
 
 
 class AioTxUTXOClient(AioTxClient):
+    # Fee estimate changes only with new blocks
+    default_cache_ttl: ClassVar[dict[str, float | None]] = {"estimate_smart_fee": 30}
+
     def __init__(
         self,
-        node_url: str,
+        node_url: str | list[str],
         headers,
         testnet: bool,
         node_username,
@@ -50,6 +64,8 @@ class AioTxUTXOClient(AioTxClient):
         self.node_password = node_password
         self.testnet = testnet
         self._network = Network(network_name)
+        # UTXO are spent in database order unless coin selection is set
+        self.coin_selection: CoinSelection | None = None
         self.monitor = UTXOMonitor(self, db_url)
         asyncio.run(self.monitor._init_db())
 
@@ -105,6 +121,98 @@ class AioTxUTXOClient(AioTxClient):
         result = await self._make_rpc_call(payload)
         return result["result"]
 
+    async def get_blocks_by_numbers(
+        self, block_numbers: list[int], verbosity: int = 2
+    ) -> list:
+        """
+        Get many blocks at once: hashes are requested with one batch call,
+        then all blocks are fetched concurrently and parsed in a thread.
+        """
+        block_hashes = await self._make_batch_rpc_call(
+            [
+                {"method": "getblockhash", "params": [block_number]}
+                for block_number in block_numbers
+            ]
+        )
+        results = await asyncio.gather(
+            *[
+                self._make_rpc_call(
+                    {"method": "getblock", "params": [block_hash, verbosity]},
+                    parse_in_thread=True,
+                )
+                for block_hash in block_hashes
+            ]
+        )
+        return [result["result"] for result in results]
+
+    def parse_raw_block(self, raw_block: str, decode_addresses: bool = True) -> dict:
+        """
+        Parse getblock result with verbosity 0. Transactions have only txid,
+        vin outpoints and vout value, n and scriptPubKey hex and address.
+        """
+        return parse_block(
+            bytes.fromhex(raw_block),
+            self._script_to_address if decode_addresses else None,
+        )
+
+    def _address_to_script(self, address: str) -> bytes | None:
+        """scriptPubKey paying to the address, None if it can't be decoded."""
+        from bitcoinlib.encoding import (
+            EncodingError,
+            addr_bech32_to_pubkeyhash,
+            change_base,
+        )
+
+        try:
+            if address.lower().startswith(f"{self._network.prefix_bech32}1"):
+                return addr_bech32_to_pubkeyhash(
+                    address, prefix=self._network.prefix_bech32, include_witver=True
+                )
+            decoded = change_base(address, 58, 256, 25)
+        except (EncodingError, ValueError):
+            return None
+        version, hash160 = decoded[:1], decoded[1:21]
+        if version == self._network.prefix_address:
+            return b"\x76\xa9\x14" + hash160 + b"\x88\xac"
+        if version == self._network.prefix_address_p2sh:
+            return b"\xa9\x14" + hash160 + b"\x87"
+        return None
+
+    def _script_to_address(self, script: bytes) -> str | None:
+        from bitcoinlib.encoding import (
+            pubkeyhash_to_addr_base58,
+            pubkeyhash_to_addr_bech32,
+        )
+
+        length = len(script)
+        # P2PKH: OP_DUP OP_HASH160 <20 bytes> OP_EQUALVERIFY OP_CHECKSIG
+        if (
+            length == 25
+            and script[:3] == b"\x76\xa9\x14"
+            and script[23:] == b"\x88\xac"
+        ):
+            return pubkeyhash_to_addr_base58(
+                script[3:23], prefix=self._network.prefix_address
+            )
+        # P2SH: OP_HASH160 <20 bytes> OP_EQUAL
+        if length == 23 and script[:2] == b"\xa9\x14" and script[22] == 0x87:
+            return pubkeyhash_to_addr_base58(
+                script[2:22], prefix=self._network.prefix_address_p2sh
+            )
+        # P2WPKH and P2WSH: OP_0 <20 or 32 bytes>, P2TR: OP_1 <32 bytes>
+        # Other witness versions (e.g. Litecoin MWEB) have no address
+        if (
+            (length in (22, 34) and script[0] == 0)
+            or (length == 34 and script[0] == 0x51)
+        ) and script[1] == length - 2:
+            return pubkeyhash_to_addr_bech32(
+                script[2:],
+                prefix=self._network.prefix_bech32,
+                witver=1 if script[0] else 0,
+                separator="1",
+            )
+        return None
+
     async def get_balance(self, address: str) -> int:
         utxo_data: list[UTXOType] = await self.monitor._get_utxo_data(address)
         if len(utxo_data) == 0:
@@ -143,7 +251,6 @@ class AioTxUTXOClient(AioTxClient):
             destinations = {from_address: 0}
             total_fee = (
                 await self._estimate_total_fee(
-                    private_key,
                     destinations,
                     conf_target,
                     estimate_mode,
@@ -179,28 +286,95 @@ class AioTxUTXOClient(AioTxClient):
 
     async def _estimate_total_fee(
         self,
-        private_key: str,
         destinations: dict,
         conf_target: int,
         estimate_mode: FeeEstimate,
-        fee_per_byte: Optional[int],
+        fee_per_byte: int | None,
         utxo_list: list,
         from_address: str,
         deduct_fee: bool,
-    ):
-        empty_fee_transaction, _, _ = await self._create_transaction(
-            destinations, utxo_list, from_address, 0, deduct_fee
+    ) -> int:
+        """
+        Fee of the transaction _create_transaction will build, calculated from its size.
+
+        Inputs are taken in the same order until they cover the amount and the fee
+        for them, transaction is assumed to have a change output.
+        """
+        total_amount = sum(destinations.values())
+        available = sum(utxo.amount_satoshi for utxo in utxo_list)
+        if available < total_amount:
+            # Checked before the fee rate is requested from the node
+            raise InsufficientFunds(
+                f"We have only {available} satoshi and it's {total_amount} at least needed to cover that transaction!"
+            )
+        fee_per_kb = await self._get_fee_per_kb(
+            conf_target, estimate_mode, fee_per_byte
         )
+        # Same limits as bitcoinlib applies when calculating the fee
+        fee_per_kb = min(max(fee_per_kb, self._network.fee_min), self._network.fee_max)
+        script_lengths = [
+            self._get_script_length(address)
+            for address in [*destinations, from_address]
+        ]
+        total_value = 0
+        fee = 0
+        for input_count, utxo in enumerate(utxo_list, start=1):
+            total_value += utxo.amount_satoshi
+            fee = int(
+                transaction_vsize(input_count, script_lengths) * fee_per_kb / 1000
+            )
+            if total_value >= total_amount + (0 if deduct_fee else fee):
+                break
+        return fee
+
+    def _get_script_length(self, address: str) -> int:
+        script = self._address_to_script(address)
+        # P2WSH and P2TR scripts are the longest standard ones
+        return 34 if script is None else len(script)
+
+    async def _get_fee_per_kb(
+        self,
+        conf_target: int,
+        estimate_mode: FeeEstimate,
+        fee_per_byte: int | None,
+    ) -> int:
         if fee_per_byte is None:
-            fee_per_kb = await self.estimate_smart_fee(conf_target, estimate_mode)
-        else:
-            fee_per_kb = fee_per_byte * 1024
-        empty_fee_transaction.fee_per_kb = fee_per_kb
-        empty_fee_transaction = self._sign_transaction(
-            empty_fee_transaction, [private_key]
+            return await self._cached("estimate_smart_fee", conf_target, estimate_mode)
+        return fee_per_byte * 1024
+
+    async def _select_coins(
+        self,
+        destinations: dict[str, int],
+        utxo_list: list[UTXOType],
+        conf_target: int,
+        estimate_mode: FeeEstimate,
+        total_fee: int | None,
+        fee_per_byte: Optional[int],
+        deduct_fee: bool,
+    ) -> tuple[list[UTXOType], int, int]:
+        """Choose inputs with coin_selection, returns them, the total fee and the change."""
+        amount = sum(destinations.values())
+        if total_fee is not None:
+            # Fee is fixed, it has to be covered together with the amount
+            selection = self.coin_selection.select(
+                utxo_list,
+                amount if deduct_fee else amount + total_fee,
+                0,
+                len(destinations),
+                subtract_fee=True,
+            )
+            # Selection fee is the change too small for its own output
+            return selection.utxo_list, total_fee + selection.fee, selection.change
+
+        fee_per_kb = await self._get_fee_per_kb(
+            conf_target, estimate_mode, fee_per_byte
+        )
+        # Same limits as bitcoinlib applies when calculating the fee
+        fee_per_kb = min(max(fee_per_kb, self._network.fee_min), self._network.fee_max)
+        selection = self.coin_selection.select(
+            utxo_list, amount, fee_per_kb / 1000, len(destinations), deduct_fee
         )
-        empty_fee_transaction.estimate_size()
-        return empty_fee_transaction.calculate_fee()
+        return selection.utxo_list, selection.fee, selection.change
 
     async def _build_and_send_transaction(
         self,
@@ -216,9 +390,21 @@ class AioTxUTXOClient(AioTxClient):
         from_address = from_wallet["address"]
         utxo_list: list[UTXOType] = await self.monitor._get_utxo_data(from_address)
 
+        change = None
+        if self.coin_selection is not None:
+            # Fee is known from the selection, no need for a trial transaction
+            utxo_list, total_fee, change = await self._select_coins(
+                destinations,
+                utxo_list,
+                conf_target,
+                estimate_mode,
+                total_fee,
+                fee_per_byte,
+                deduct_fee,
+            )
+
         if total_fee is None:
             total_fee = await self._estimate_total_fee(
-                private_key,
                 destinations,
                 conf_target,
                 estimate_mode,
@@ -229,7 +415,13 @@ class AioTxUTXOClient(AioTxClient):
             )
 
         transaction, inputs_used, outputs_used = await self._create_transaction(
-            destinations, utxo_list, from_address, total_fee, deduct_fee
+            destinations,
+            utxo_list,
+            from_address,
+            total_fee,
+            deduct_fee,
+            use_all_inputs=self.coin_selection is not None,
+            change=change,
         )
 
         signed_tx = self._sign_transaction(
@@ -329,7 +521,15 @@ class AioTxUTXOClient(AioTxClient):
         from_address: str,
         fee: int,
         deduct_fee: bool,
+        use_all_inputs: bool = False,
+        change: int | None = None,
     ):
+        """
+        Change output gets everything not sent or paid as fee, unless change is given.
+
+        With deduct_fee recipients pay the fee, except the part covered by inputs
+        value not going to the change output.
+        """
         from bitcoinlib.transactions import Transaction
 
         transaction = Transaction(network=self._network.name, witness_type="segwit")
@@ -341,7 +541,7 @@ class AioTxUTXOClient(AioTxClient):
             input_data = (utxo.tx_id, utxo.output_n, utxo.amount_satoshi)
             inputs.append(input_data)
             total_value += utxo.amount_satoshi
-            if total_value >= total_amount + fee:
+            if total_value >= total_amount + fee and not use_all_inputs:
                 break
         total_spend = total_amount + fee if not deduct_fee else total_amount
         if total_value < total_spend:
@@ -349,7 +549,9 @@ class AioTxUTXOClient(AioTxClient):
                 f"We have only {total_value} satoshi and it's {total_amount + fee} at least needed to cover that transaction!"
             )
 
-        if deduct_fee:
+        if change is not None:
+            leftover = change
+        elif deduct_fee:
             leftover = total_value - total_amount
         else:
             leftover = int(total_value - total_amount - fee)
@@ -357,7 +559,11 @@ class AioTxUTXOClient(AioTxClient):
         if leftover > 0:
             outputs.append((from_address, leftover))
 
-        deducted_fee_amount = 0 if not deduct_fee else fee / len(destinations)
+        deducted_fee_amount = (
+            0
+            if not deduct_fee
+            else (fee - (total_value - total_amount - leftover)) / len(destinations)
+        )
 
         for address, amount in destinations.items():
             outputs.append((address, int(amount - deducted_fee_amount)))
@@ -407,41 +613,94 @@ class AioTxUTXOClient(AioTxClient):
         return self.to_satoshi(result["result"]["feerate"])
 
     def _check_connection(self) -> None:
+        # UTXO client can be used without connect(), in that case
+        # every RPC call is made with its own short-living session
         return None
 
-    async def _make_rpc_call(self, payload) -> dict:
+    async def _make_rpc_call(self, payload, parse_in_thread: bool = False) -> dict:
         payload["jsonrpc"] = "2.0"
         payload["id"] = "curltest"
         logger.info(f"rpc call payload: {payload}")
+        result = await self._send_rpc_request(
+            json.dumps(payload),
+            idempotent=payload["method"] not in WRITE_RPC_METHODS,
+            parse_in_thread=parse_in_thread,
+        )
+        return self._process_rpc_result(result)
+
+    async def _make_batch_rpc_call(self, payloads: list[dict]) -> list:
+        """Send payloads as one JSON-RPC batch, results are returned in the same order as payloads."""
+        for request_id, payload in enumerate(payloads):
+            payload["jsonrpc"] = "2.0"
+            payload["id"] = request_id
+        logger.info(f"rpc batch call payload: {payloads}")
+        results = await self._send_rpc_request(
+            json.dumps(payloads),
+            idempotent=all(
+                payload["method"] not in WRITE_RPC_METHODS for payload in payloads
+            ),
+        )
+        if isinstance(results, dict):
+            # Whole batch was rejected
+            self._process_rpc_result(results)
+            raise RpcConnectionError(f"Unexpected batch response: {results}")
+        results_by_id = {
+            result.get("id"): self._process_rpc_result(result) for result in results
+        }
+        return [
+            results_by_id[request_id]["result"] for request_id in range(len(payloads))
+        ]
+
+    async def _send_rpc_request(
+        self, data: str, idempotent: bool, parse_in_thread: bool = False
+    ):
+        request_kwargs = {
+            "data": data,
+            "headers": self._headers,
+            "auth": aiohttp.BasicAuth(self.node_username, self.node_password),
+        }
+        if self._connected:
+            response = await self._make_request(
+                "POST", self.node_url, idempotent=idempotent, **request_kwargs
+            )
+            return await self._read_rpc_response(response, parse_in_thread)
+
+        # Not connected yet, for example during database initialization
+        # in __init__ which is running in its own event loop
         async with aiohttp.ClientSession() as session:
-            async with session.post(
-                self.node_url,
-                data=json.dumps(payload),
-                headers=self._headers,
-                auth=aiohttp.BasicAuth(self.node_username, self.node_password),
-            ) as response:
-                if response.status != 200:
-                    raise RpcConnectionError(await response.text())
-                result = await response.json()
-                error = result.get("error")
-                logger.info(f"rpc call result: {result}")
-                if error is None:
-                    return result
-
-                error_code = error.get("code")
-                error_message = error.get("message")
-                if error_code == -5:
-                    raise BlockNotFoundError(error_message)
-                elif error_code == -8:
-                    raise InvalidArgumentError(error_message)
-                elif error_code == -32600:
-                    raise InvalidRequestError(error_message)
-                elif error_code == -32601:
-                    raise MethodNotFoundError(error_message)
-                elif error_code == -32603:
-                    raise InternalJSONRPCError(error_message)
-                else:
-                    raise RpcConnectionError(f"Error {error_code}: {error_message}")
+            async with session.post(self.node_url, **request_kwargs) as response:
+                return await self._read_rpc_response(response, parse_in_thread)
+
+    async def _read_rpc_response(
+        self, response: aiohttp.ClientResponse, parse_in_thread: bool = False
+    ) -> dict | list:
+        body = await self._read_response(response)
+        if response.status != 200:
+            raise RpcConnectionError(body.decode(errors="replace"))
+        # Big blocks take tens of milliseconds to parse, don't block the event loop
+        return await self._decode_json(body, parse_in_thread)
+
+    def _process_rpc_result(self, result: dict) -> dict:
+        error = result.get("error")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"rpc call result: {result}")
+        if error is None:
+            return result
+
+        error_code = error.get("code")
+        error_message = error.get("message")
+        if error_code == -5:
+            raise BlockNotFoundError(error_message)
+        elif error_code == -8:
+            raise InvalidArgumentError(error_message)
+        elif error_code == -32600:
+            raise InvalidRequestError(error_message)
+        elif error_code == -32601:
+            raise MethodNotFoundError(error_message)
+        elif error_code == -32603:
+            raise InternalJSONRPCError(error_message)
+        else:
+            raise RpcConnectionError(f"Error {error_code}: {error_message}")
 
 
 class UTXOMonitor(BlockMonitor):
@@ -461,6 +720,8 @@ class UTXOMonitor(BlockMonitor):
         self.transaction_handlers = []
         self.new_utxo_transaction_handlers = []
         self.block_transactions_handlers = []
+        self.rollback_handlers = []
+        self.seen_block_handlers = []
         self.running = False
         self._db_url = db_url
         self._engine = create_async_engine(db_url, poolclass=NullPool)
@@ -470,25 +731,312 @@ class UTXOMonitor(BlockMonitor):
         self.Address = create_address_model(self.client._network.name)
         self.UTXO = create_utxo_model(self.client._network.name)
         self.LastBlock = create_last_block_model(self.client._network.name)
+        # Loaded from database on first use, see invalidate_index
+        self._address_index: set[str] | None = None
+        self._outpoint_index: set[bytes] | None = None
+        # With address filter enabled watched addresses are not kept in memory
+        self._address_filter: BloomFilter | None = None
+        self._address_filter_params: tuple[int, float] | None = None
+        # How many blocks are fetched concurrently while monitor is behind
+        self.catch_up_window = 1
+        # Fetch serialized blocks and parse them locally instead of verbose JSON
+        self.raw_blocks = False
+        # Match outputs by scriptPubKey of watched addresses instead of address strings
+        self.match_scripts = False
+        self._script_index: dict[str, str] | None = None
+        self._prefetch: tuple[int, asyncio.Task] | None = None
+        # (block number, created outpoints, deleted rows) of recent blocks
+        self._journal = deque(maxlen=self.reorg_buffer_size)
+
+    def enable_address_filter(self, capacity: int, error_rate: float = 0.001) -> None:
+        """
+        Keep a Bloom filter of watched addresses instead of the full set in memory.
 
-    async def poll_blocks(self, _: int):
+        Addresses passing the filter are checked in database, so memory stays bounded
+        with millions of addresses. capacity should be larger than the number of watched addresses.
+        """
+        self._address_filter_params = (capacity, error_rate)
+        self._address_filter = None
+        self._address_index = None
+        self._script_index = None
+
+    def invalidate_index(self) -> None:
+        """
+        Reload watched addresses and UTXO from database before the next block.
+
+        Call it if the tables were changed not through this monitor,
+        for example by another process.
+        """
+        self._address_index = None
+        self._outpoint_index = None
+        self._address_filter = None
+        self._script_index = None
+
+    async def _get_address_index(self) -> set[str]:
+        if self._address_index is None:
+            self._address_index = await self._get_addresses()
+        return self._address_index
+
+    def _uses_script_index(self) -> bool:
+        # Address filter keeps addresses out of memory, so scripts can't be indexed
+        return self.match_scripts and self._address_filter_params is None
+
+    async def _get_script_index(self) -> dict[str, str]:
+        """scriptPubKey hex -> watched address."""
+        if self._script_index is None:
+            script_index = {}
+            for address in await self._get_address_index():
+                self._add_to_script_index(script_index, address)
+            self._script_index = script_index
+        return self._script_index
+
+    def _add_to_script_index(self, script_index: dict[str, str], address: str) -> None:
+        script = self.client._address_to_script(address)
+        if script is None:
+            logger.warning(f"Can't get scriptPubKey of {address}, it won't be matched")
+        else:
+            script_index[script.hex()] = address
+
+    async def _get_address_filter(self) -> BloomFilter:
+        from sqlalchemy import select
+
+        if self._address_filter is None:
+            address_filter = BloomFilter(*self._address_filter_params)
+            async with self._session() as session:
+                result = await session.stream_scalars(select(self.Address.address))
+                async for address in result:
+                    address_filter.add(address)
+            self._address_filter = address_filter
+        return self._address_filter
+
+    async def _get_watched_addresses(self, addresses: set[str]) -> set[str]:
+        """Return which of the given addresses are watched."""
+        if self._address_filter_params is None:
+            return addresses & await self._get_address_index()
+
+        from sqlalchemy import select
+
+        address_filter = await self._get_address_filter()
+        candidates = [address for address in addresses if address in address_filter]
+        watched = set()
+        async with self._session() as session:
+            for i in range(0, len(candidates), 400):
+                result = await session.execute(
+                    select(self.Address.address).where(
+                        self.Address.address.in_(candidates[i : i + 400])
+                    )
+                )
+                watched.update(row[0] for row in result.fetchall())
+        return watched
+
+    async def _get_outpoint_index(self) -> set[bytes]:
+        if self._outpoint_index is None:
+            self._outpoint_index = await self._get_all_outpoints()
+        return self._outpoint_index
+
+    @staticmethod
+    def _outpoint_key(tx_id: str, output_n: int) -> bytes:
+        # 36 bytes instead of a tuple with 64 chars hex string
+        return bytes.fromhex(tx_id) + output_n.to_bytes(4, "little")
+
+    async def poll_blocks(self, _: int) -> int:
         network_last_block = await self.client.get_last_block_number()
-        local_latest_block = await self._get_last_block()
+        self._observe_network_head(network_last_block)
+        if self._pending_blocks:
+            local_latest_block = self._pending_blocks[-1][0] + 1
+        else:
+            local_latest_block = await self._get_last_block()
         if local_latest_block is None:
             local_latest_block = network_last_block
         if network_last_block < local_latest_block:
-            return
-        block_data = await self.client.get_block_by_number(local_latest_block)
-        await self.process_block(local_latest_block, block_data)
-        next_block = local_latest_block + 1
-        await self._update_last_block(next_block)
+            return 0
+        if self.catch_up_window <= 1:
+            blocks = [await self._get_block(local_latest_block)]
+        else:
+            blocks = await self._get_window(local_latest_block, network_last_block)
+            last_block = local_latest_block + len(blocks) - 1
+            if last_block < network_last_block:
+                # Fetch next window while the current one is processed
+                next_task = asyncio.create_task(
+                    self._fetch_window(last_block + 1, network_last_block)
+                )
+                self._prefetch = (last_block + 1, next_task)
+
+        blocks = list(enumerate(blocks, start=local_latest_block))
+        for index, (block_number, block_data) in enumerate(blocks):
+            fork_block = await self._check_block_linkage(
+                block_number, block_data["hash"], block_data.get("previousblockhash")
+            )
+            if fork_block is not None:
+                if index:
+                    await self._deliver_blocks(blocks[:index], network_last_block)
+                await self._handle_rollback(fork_block)
+                return network_last_block - fork_block + 1
+        await self._deliver_blocks(blocks, network_last_block)
+        return network_last_block - blocks[-1][0]
+
+    async def _process_confirmed_blocks(self, blocks, network_last_block):
+        await self.process_blocks(blocks)
+
+    async def _get_block_hash(self, block_number: int) -> str:
+        result = await self.client._make_rpc_call(
+            {"method": "getblockhash", "params": [block_number]}
+        )
+        return result["result"]
+
+    async def _get_window(self, start_block: int, network_last_block: int) -> list:
+        if self._prefetch is not None:
+            prefetch_start, task = self._prefetch
+            self._prefetch = None
+            if prefetch_start == start_block:
+                with suppress(Exception):
+                    return await task
+            else:
+                task.cancel()
+        return await self._fetch_window(start_block, network_last_block)
+
+    async def _fetch_window(self, start_block: int, network_last_block: int) -> list:
+        last_block = min(start_block + self.catch_up_window - 1, network_last_block)
+        block_numbers = list(range(start_block, last_block + 1))
+        if not self.raw_blocks:
+            return await self.client.get_blocks_by_numbers(block_numbers)
+        raw_blocks = await self.client.get_blocks_by_numbers(block_numbers, 0)
+        return await self._parse_raw_blocks(block_numbers, raw_blocks)
+
+    async def _get_block(self, block_number: int) -> dict:
+        if not self.raw_blocks:
+            return await self.client.get_block_by_number(block_number)
+        raw_block = await self.client.get_block_by_number(block_number, 0)
+        blocks = await self._parse_raw_blocks([block_number], [raw_block])
+        return blocks[0]
+
+    async def _parse_raw_blocks(
+        self, block_numbers: list[int], raw_blocks: list[str]
+    ) -> list:
+        decode_addresses = not self._uses_script_index()
+
+        def parse(raw_block: str) -> dict | None:
+            try:
+                return self.client.parse_raw_block(raw_block, decode_addresses)
+            except UnsupportedTransactionError:
+                return None
+
+        blocks = await asyncio.to_thread(
+            lambda: [parse(raw_block) for raw_block in raw_blocks]
+        )
+        for index, block_number in enumerate(block_numbers):
+            if blocks[index] is None:
+                logger.warning(
+                    f"Block {block_number} can't be parsed locally, fetching it decoded by the node"
+                )
+                blocks[index] = await self.client.get_block_by_number(block_number)
+        return blocks
+
+    async def shutdown(self, **kwargs):
+        if self._prefetch is not None:
+            self._prefetch[1].cancel()
+            self._prefetch = None
+        await super().shutdown(**kwargs)
+
+    def _checkpoint_state(self) -> dict | None:
+        # Progress is already kept in LastBlock table
+        return None
 
     async def process_block(self, block_number, block_data):
-        await self._update_last_block(block_number)
-        for handler in self.block_handlers:
-            await handler(block_number)
+        await self.process_blocks([(block_number, block_data)])
 
-        addresses = await self._get_addresses()
+    async def process_blocks(self, blocks: list[tuple[int, dict]]):
+        """
+        Store UTXO changes of consecutive blocks in one transaction, then call handlers
+        block by block and move the last block after each of them.
+        If a handler fails or is cancelled, processing will continue from its block.
+        """
+        new_utxo = []
+        spent_utxo = []
+        new_utxo_transactions = {}
+        # block number -> (created outpoints, spent outpoints)
+        block_changes = {}
+        outpoints = await self._get_outpoint_index()
+        batch_outpoints = set()
+        for block_number, block_data in blocks:
+            block_new_utxo, block_new_utxo_transactions = await self._get_new_utxo(
+                block_data
+            )
+            new_utxo.extend(block_new_utxo)
+            new_utxo_transactions[block_number] = block_new_utxo_transactions
+            block_changes[block_number] = (
+                [(tx_id, output_n) for _, tx_id, _, output_n in block_new_utxo],
+                [],
+            )
+            # UTXO can be spent in the same batch it was created
+            batch_outpoints.update(
+                self._outpoint_key(tx_id, output_n)
+                for _, tx_id, _, output_n in block_new_utxo
+            )
+            for transaction in block_data["tx"]:
+                for input_utxo in transaction["vin"]:
+                    txid = input_utxo.get("txid")
+                    vout = input_utxo.get("vout")
+                    if txid is None or vout is None:
+                        continue
+                    key = self._outpoint_key(txid, vout)
+                    if key in outpoints or key in batch_outpoints:
+                        spent_utxo.append((txid, vout))
+                        block_changes[block_number][1].append((txid, vout))
+
+        has_handlers = any(
+            (
+                self.block_handlers,
+                self.new_utxo_transaction_handlers,
+                self.transaction_handlers,
+                self.block_transactions_handlers,
+            )
+        )
+        # Blocks stay unprocessed until their handlers are done, applying
+        # them again is safe, UTXO changes are idempotent
+        deleted_rows = await self._apply_block_changes(
+            blocks[0][0] if has_handlers else blocks[-1][0] + 1, new_utxo, spent_utxo
+        )
+        self._add_to_journal(block_changes, deleted_rows)
+        if not has_handlers:
+            return
+
+        for block_number, block_data in blocks:
+            for handler in self.block_handlers:
+                await handler(block_number)
+
+            for transaction in new_utxo_transactions[block_number]:
+                for handler in self.new_utxo_transaction_handlers:
+                    await handler(transaction)
+
+            for transaction in block_data["tx"]:
+                for handler in self.transaction_handlers:
+                    await handler(transaction)
+            for handler in self.block_transactions_handlers:
+                await handler(block_data["tx"])
+            await self._update_last_block(block_number + 1)
+
+    def _add_to_journal(self, block_changes: dict, deleted_rows: list[dict]) -> None:
+        """Remember what was changed by every block to revert it on chain reorganization."""
+        # Blocks processed again replace their old entries
+        first_block = min(block_changes)
+        while self._journal and self._journal[-1][0] >= first_block:
+            self._journal.pop()
+        deleted = {(row["tx_id"], row["output_n"]): row for row in deleted_rows}
+        for block_number, (created, spent) in sorted(block_changes.items()):
+            self._journal.append(
+                (
+                    block_number,
+                    created,
+                    [deleted[outpoint] for outpoint in spent if outpoint in deleted],
+                )
+            )
+
+    async def _get_new_utxo(self, block_data: dict) -> tuple[list, list]:
+        """Find outputs to watched addresses, returns new UTXO and their transactions."""
+        if self._uses_script_index():
+            return await self._get_new_utxo_by_script(block_data)
+        outputs = []
         for transaction in block_data["tx"]:
             for output in transaction["vout"]:
                 outputs_scriptPubKey = output.get("scriptPubKey")
@@ -506,33 +1054,165 @@ class UTXOMonitor(BlockMonitor):
                 else:
                     to_address = output_address
 
-                if to_address not in addresses:
-                    continue
+                outputs.append((transaction, output, to_address))
 
-                value = self.client.to_satoshi(output["value"])
-                output_n = output["n"]
-                await self._add_new_utxo(
-                    to_address, transaction["txid"], value, output_n
-                )
+        addresses = await self._get_watched_addresses(
+            {to_address for _, _, to_address in outputs}
+        )
+        new_utxo = []
+        new_utxo_transactions = []
+        for transaction, output, to_address in outputs:
+            if to_address not in addresses:
+                continue
 
-                for handler in self.new_utxo_transaction_handlers:
-                    await handler(transaction)
+            value = self.client.to_satoshi(output["value"])
+            new_utxo.append((to_address, transaction["txid"], value, output["n"]))
+            new_utxo_transactions.append(transaction)
+        return new_utxo, new_utxo_transactions
 
-        all_utxo_tx_ids = await self._get_all_utxo_tx_ids()
+    async def _get_new_utxo_by_script(self, block_data: dict) -> tuple[list, list]:
+        script_index = await self._get_script_index()
+        new_utxo = []
+        new_utxo_transactions = []
         for transaction in block_data["tx"]:
-            for input_utxo in transaction["vin"]:
-                txid = input_utxo.get("txid")
-                vout = input_utxo.get("vout")
-                if txid is None or vout is None:
+            for output in transaction["vout"]:
+                script_pub_key = output.get("scriptPubKey")
+                if script_pub_key is None:
+                    continue
+                to_address = script_index.get(script_pub_key["hex"])
+                if to_address is None:
                     continue
-                if txid in all_utxo_tx_ids:
-                    await self._process_input_utxo(txid, vout)
+                # Raw blocks are parsed without addresses in this mode
+                script_pub_key.setdefault("address", to_address)
+                value = self.client.to_satoshi(output["value"])
+                new_utxo.append((to_address, transaction["txid"], value, output["n"]))
+                new_utxo_transactions.append(transaction)
+        return new_utxo, new_utxo_transactions
+
+    def _upsert_utxo_statement(self, values: list[dict]):
+        from sqlalchemy import insert
+
+        dialect = self._engine.dialect.name
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        elif dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect in ("mysql", "mariadb"):
+            from sqlalchemy.dialects.mysql import insert
+
+            return insert(self.UTXO).values(values).on_duplicate_key_update(used=False)
+        else:
+            return None
+        return (
+            insert(self.UTXO)
+            .values(values)
+            .on_conflict_do_update(
+                index_elements=[self.UTXO.tx_id, self.UTXO.output_n],
+                set_={"used": False},
+            )
+        )
 
-        for transaction in block_data["tx"]:
-            for handler in self.transaction_handlers:
-                await handler(transaction)
-        for handler in self.block_transactions_handlers:
-            await handler(block_data["tx"])
+    async def _apply_block_changes(
+        self,
+        next_block: int,
+        new_utxo: list[tuple[str, str, int, int]],
+        spent_utxo: list[tuple[str, int]],
+    ) -> list[dict]:
+        """
+        Add new (address, tx_id, amount, output_n) UTXO, delete spent (tx_id, output_n) ones and move LastBlock.
+
+        Returns deleted rows, so they can be restored on chain reorganization.
+        """
+        async with self._session() as session, session.begin():
+            values = [
+                {
+                    "address": address,
+                    "tx_id": tx_id,
+                    "amount_satoshi": amount,
+                    "output_n": output_n,
+                    "used": False,
+                }
+                for address, tx_id, amount, output_n in new_utxo
+            ]
+            await self._upsert_utxo(session, values)
+            deleted_rows = await self._delete_outpoints(session, spent_utxo)
+            await self._set_last_block(session, next_block)
+
+        if self._outpoint_index is not None:
+            self._outpoint_index.update(
+                self._outpoint_key(tx_id, output_n)
+                for _, tx_id, _, output_n in new_utxo
+            )
+            self._outpoint_index.difference_update(
+                self._outpoint_key(tx_id, output_n) for tx_id, output_n in spent_utxo
+            )
+        return deleted_rows
+
+    async def _upsert_utxo(self, session, values: list[dict]) -> None:
+        # Chunks keep number of bound parameters under database limits
+        for i in range(0, len(values), 400):
+            statement = self._upsert_utxo_statement(values[i : i + 400])
+            if statement is not None:
+                await session.execute(statement)
+            else:
+                for value in values[i : i + 400]:
+                    await session.merge(self.UTXO(**value))
+                await session.flush()
+
+    async def _delete_outpoints(
+        self, session, outpoints: list[tuple[str, int]]
+    ) -> list[dict]:
+        from sqlalchemy import delete, select, tuple_
+
+        deleted_rows = []
+        for i in range(0, len(outpoints), 400):
+            condition = tuple_(self.UTXO.tx_id, self.UTXO.output_n).in_(
+                outpoints[i : i + 400]
+            )
+            result = await session.execute(
+                select(
+                    self.UTXO.address,
+                    self.UTXO.tx_id,
+                    self.UTXO.amount_satoshi,
+                    self.UTXO.output_n,
+                    self.UTXO.used,
+                ).where(condition)
+            )
+            deleted_rows.extend(dict(row._mapping) for row in result.fetchall())
+            await session.execute(delete(self.UTXO).where(condition))
+        return deleted_rows
+
+    async def _set_last_block(self, session, block_number: int) -> None:
+        from sqlalchemy import select, update
+
+        result = await session.execute(
+            update(self.LastBlock).values(block_number=block_number)
+        )
+        if result.rowcount == 0:
+            last_block = await session.scalar(select(self.LastBlock))
+            if last_block is None:
+                session.add(self.LastBlock(block_number=block_number))
+
+    async def _rollback(self, block_number: int) -> None:
+        """Revert UTXO changes of blocks from block_number using the journal."""
+        last_block = await self._get_last_block()
+        if last_block is not None and last_block <= block_number:
+            # Only blocks waiting for confirmations were orphaned
+            return
+        entries = [entry for entry in self._journal if entry[0] >= block_number]
+        if not entries or entries[0][0] != block_number:
+            logger.error(
+                f"UTXO changes before block {entries[0][0] if entries else block_number} "
+                f"can't be reverted, they are not in the journal"
+            )
+        async with self._session() as session, session.begin():
+            for _, created, deleted_rows in reversed(entries):
+                await self._delete_outpoints(session, created)
+                await self._upsert_utxo(session, deleted_rows)
+            await self._set_last_block(session, block_number)
+        while self._journal and self._journal[-1][0] >= block_number:
+            self._journal.pop()
+        self._outpoint_index = None
 
     async def _init_db(self) -> None:
         from aiotx.utils.utxo_db_models import Base
@@ -553,6 +1233,7 @@ class UTXOMonitor(BlockMonitor):
 
         async with self._engine.begin() as conn:
             await conn.run_sync(Base.metadata.drop_all)
+        self.invalidate_index()
 
     async def _add_new_address(self, address: str, block_number: int = None) -> None:
         from sqlalchemy import select
@@ -573,6 +1254,12 @@ class UTXOMonitor(BlockMonitor):
                         self.Address(address=address, block_number=block_number)
                     )
                 await session.commit()
+        if self._address_index is not None:
+            self._address_index.add(address)
+        if self._script_index is not None:
+            self._add_to_script_index(self._script_index, address)
+        if self._address_filter is not None:
+            self._address_filter.add(address)
         last_known_block = await self._get_last_block()
         if last_known_block is None or last_known_block > block_number:
             await self._update_last_block(block_number)
@@ -601,6 +1288,8 @@ class UTXOMonitor(BlockMonitor):
                         )
                     )
                 await session.commit()
+        if self._outpoint_index is not None:
+            self._outpoint_index.add(self._outpoint_key(tx_id, output_n))
 
     async def _update_last_block(self, block_number: int) -> None:
         from sqlalchemy import select
@@ -693,21 +1382,21 @@ class UTXOMonitor(BlockMonitor):
                 for row in rows
             ]
 
-    async def _get_all_utxo_tx_ids(self) -> list[str]:
+    async def _get_all_outpoints(self) -> set[bytes]:
         from sqlalchemy import select
 
-        """
-        Function to optimize UTXO checking on new block to not make a SELECT for each input in the block
-        """
+        # Used UTXO are kept too, they are deleted when spending transaction is mined
         async with self._session() as session:
-            result = await session.execute(select(self.UTXO.tx_id))
-            return {row[0] for row in result.fetchall()}
+            result = await session.execute(select(self.UTXO.tx_id, self.UTXO.output_n))
+            return {self._outpoint_key(row[0], row[1]) for row in result.fetchall()}
 
     async def _delete_utxo(self, tx_id: str, output_n: int) -> None:
         async with self._session() as session:
             async with session.begin():
                 await session.delete(await session.get(self.UTXO, (tx_id, output_n)))
                 await session.commit()
+        if self._outpoint_index is not None:
+            self._outpoint_index.discard(self._outpoint_key(tx_id, output_n))
 
     async def _get_last_block(self) -> Optional[int]:
         from sqlalchemy import select
@@ -716,7 +1405,7 @@ class UTXOMonitor(BlockMonitor):
             result = await session.execute(select(self.LastBlock.block_number))
             return result.scalar()
 
-    async def _get_addresses(self) -> list[str]:
+    async def _get_addresses(self) -> set[str]:
         from sqlalchemy import select
 
         async with self._session() as session:
@@ -12,6 +12,10 @@ class BlockMonitoringError(AioTxError):
     pass
 
 
+class UnsupportedTransactionError(AioTxError):
+    pass
+
+
 class InternalJSONRPCError(AioTxError):
     pass
 
@@ -0,0 +1,57 @@
+import hashlib
+import math
+from collections.abc import Iterable
+
+
+class BloomFilter:
+    """
+    Probabilistic set of addresses with bounded memory.
+
+    `item in bloom_filter` is never False for added items, but can be True for
+    items which were not added with probability close to error_rate while
+    no more than capacity items are added.
+    Strings are compared as is, normalize addresses (e.g. lowercase EVM addresses)
+    before adding and checking.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        if capacity <= 0:
+            raise ValueError("Capacity should be positive")
+        if not 0 < error_rate < 1:
+            raise ValueError("Error rate should be between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def _positions(self, item: str | bytes):
+        if isinstance(item, str):
+            item = item.encode()
+        digest = hashlib.blake2b(item, digest_size=16).digest()
+        # Double hashing: i-th position is h1 + i * h2
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str | bytes) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self._count += 1
+
+    def update(self, items: Iterable[str | bytes]) -> None:
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item: str | bytes) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import os
+import sqlite3
+
+
+class CheckpointStore:
+    """
+    Keeps monitoring progress between restarts.
+
+    State is a JSON serializable dict, every monitor stores it under its own key.
+    """
+
+    async def load(self, key: str) -> dict | None:
+        raise NotImplementedError("load method must be implemented by subclasses")
+
+    async def save(self, key: str, state: dict) -> None:
+        raise NotImplementedError("save method must be implemented by subclasses")
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryCheckpointStore(CheckpointStore):
+    def __init__(self):
+        self._states = {}
+
+    async def load(self, key: str) -> dict | None:
+        state = self._states.get(key)
+        return None if state is None else dict(state)
+
+    async def save(self, key: str, state: dict) -> None:
+        self._states[key] = dict(state)
+
+
+class FileCheckpointStore(CheckpointStore):
+    """Stores all keys in one JSON file, file is replaced atomically on every save."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = asyncio.Lock()
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _write(self, key: str, state: dict) -> None:
+        states = self._read()
+        states[key] = state
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(states, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    async def load(self, key: str) -> dict | None:
+        async with self._lock:
+            states = await asyncio.to_thread(self._read)
+        return states.get(key)
+
+    async def save(self, key: str, state: dict) -> None:
+        async with self._lock:
+            await asyncio.to_thread(self._write, key, state)
+
+
+class SQLiteCheckpointStore(CheckpointStore):
+    def __init__(self, path: str, table_name: str = "aiotx_checkpoints"):
+        self.path = path
+        self.table_name = table_name
+        self._connection: sqlite3.Connection | None = None
+        self._lock = asyncio.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table_name} "
+                "(key TEXT PRIMARY KEY, state TEXT NOT NULL)"
+            )
+            self._connection.commit()
+        return self._connection
+
+    def _read(self, key: str) -> dict | None:
+        row = (
+            self._connect()
+            .execute(f"SELECT state FROM {self.table_name} WHERE key = ?", (key,))
+            .fetchone()
+        )
+        return None if row is None else json.loads(row[0])
+
+    def _write(self, key: str, state: dict) -> None:
+        connection = self._connect()
+        connection.execute(
+            f"INSERT OR REPLACE INTO {self.table_name} (key, state) VALUES (?, ?)",
+            (key, json.dumps(state)),
+        )
+        connection.commit()
+
+    async def load(self, key: str) -> dict | None:
+        async with self._lock:
+            return await asyncio.to_thread(self._read, key)
+
+    async def save(self, key: str, state: dict) -> None:
+        async with self._lock:
+            await asyncio.to_thread(self._write, key, state)
+
+    async def close(self) -> None:
+        async with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
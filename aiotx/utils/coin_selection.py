@@ -0,0 +1,246 @@
+import math
+import random
+from typing import NamedTuple
+
+from aiotx.exceptions import InsufficientFunds
+from aiotx.types import UTXOType
+from aiotx.utils.tx_size import P2WPKH_INPUT_WEIGHT, TX_OVERHEAD_WEIGHT, output_weight
+
+# Virtual sizes of P2WPKH transaction parts, fee is vsize * fee_rate
+# Overhead includes one byte input and output counts
+TX_OVERHEAD_VSIZE = (TX_OVERHEAD_WEIGHT + 4 * 2) / 4
+P2WPKH_INPUT_VSIZE = P2WPKH_INPUT_WEIGHT / 4
+P2WPKH_OUTPUT_VSIZE = output_weight() / 4
+
+
+class SelectionResult(NamedTuple):
+    utxo_list: list[UTXOType]
+    fee: int
+    change: int  # 0 if transaction has no change output
+
+
+class CoinSelection:
+    """
+    Chooses which UTXO to spend.
+
+    Every UTXO is valued by its effective value: amount minus the fee for spending it
+    (input vsize * fee_rate), so UTXO which cost more to spend than they bring are skipped.
+    Candidates are sorted once by effective value, subclasses pick a subset covering
+    the target in _select.
+    """
+
+    def __init__(self, min_change: int = 1000):
+        # Smaller change is added to the fee instead of creating a dust output
+        self.min_change = min_change
+
+    def select(
+        self,
+        utxo_list: list[UTXOType],
+        amount: int,
+        fee_rate: float,
+        output_count: int = 1,
+        subtract_fee: bool = False,
+    ) -> SelectionResult:
+        """
+        Select UTXO to send amount to output_count outputs paying fee_rate satoshi per vbyte.
+
+        With subtract_fee the fee is paid by recipients, so only the amount has to be covered.
+        """
+        input_fee = math.ceil(P2WPKH_INPUT_VSIZE * fee_rate)
+        base_fee = math.ceil(
+            (TX_OVERHEAD_VSIZE + output_count * P2WPKH_OUTPUT_VSIZE) * fee_rate
+        )
+        change_fee = math.ceil(P2WPKH_OUTPUT_VSIZE * fee_rate)
+        if subtract_fee:
+            target = amount
+            candidates = [(utxo.amount_satoshi, utxo) for utxo in utxo_list]
+        else:
+            target = amount + base_fee
+            candidates = [
+                (utxo.amount_satoshi - input_fee, utxo)
+                for utxo in utxo_list
+                if utxo.amount_satoshi > input_fee
+            ]
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+
+        # Changeless result may overpay at most what a change output would cost
+        selected = self._select(candidates, target, change_fee + self.min_change)
+        if selected is None:
+            available = sum(value for value, _ in candidates)
+            raise InsufficientFunds(
+                f"We have only {available} satoshi and it's {target} at least needed to cover that transaction!"
+            )
+
+        selected_value = sum(value for value, _ in selected)
+        utxo_list = [utxo for _, utxo in selected]
+        fee = base_fee + len(utxo_list) * input_fee
+        change = selected_value - target
+        if change >= change_fee + self.min_change:
+            fee += change_fee
+            change -= change_fee
+        else:
+            # Dust output would be rejected, it's added to the fee
+            fee += change
+            change = 0
+        return SelectionResult(utxo_list, fee, change)
+
+    def _select(
+        self, candidates: list[tuple[int, UTXOType]], target: int, cost_of_change: int
+    ) -> list[tuple[int, UTXOType]] | None:
+        """Candidates are (effective value, UTXO) sorted by value descending."""
+        raise NotImplementedError("_select method must be implemented by subclasses")
+
+
+class LargestFirst(CoinSelection):
+    """Spend the biggest UTXO first, uses the fewest inputs."""
+
+    def _select(self, candidates, target, cost_of_change):
+        selected = []
+        total = 0
+        for candidate in candidates:
+            selected.append(candidate)
+            total += candidate[0]
+            if total >= target:
+                return selected
+        return None
+
+
+class Consolidation(CoinSelection):
+    """Spend every UTXO worth spending, for merging small UTXO while fees are low."""
+
+    def _select(self, candidates, target, cost_of_change):
+        if sum(value for value, _ in candidates) < target:
+            return None
+        return candidates
+
+
+class BranchAndBound(CoinSelection):
+    """
+    Search for an input set without change output.
+
+    Depth-first search over candidates for a sum between target and target + cost_of_change
+    with the smallest excess, limited to max_tries steps. If there is no such set,
+    fallback selection is used.
+    """
+
+    def __init__(
+        self,
+        min_change: int = 1000,
+        max_tries: int = 100_000,
+        fallback: CoinSelection | None = None,
+    ):
+        super().__init__(min_change)
+        self.max_tries = max_tries
+        self.fallback = fallback if fallback is not None else Knapsack(min_change)
+
+    def _select(self, candidates, target, cost_of_change):
+        selected = self._search(candidates, target, cost_of_change)
+        if selected is None:
+            return self.fallback._select(candidates, target, cost_of_change)
+        return selected
+
+    def _search(self, candidates, target, cost_of_change):
+        values = [value for value, _ in candidates]
+        # Sum of values from index to the end, to cut branches which can't reach target
+        remaining = [0] * (len(values) + 1)
+        for index in range(len(values) - 1, -1, -1):
+            remaining[index] = remaining[index + 1] + values[index]
+        if remaining[0] < target:
+            return None
+
+        best: list[int] | None = None
+        best_excess = cost_of_change + 1
+        # Stack of (index, included indexes, sum of included)
+        stack = [(0, [], 0)]
+        tries = 0
+        while stack and tries < self.max_tries:
+            tries += 1
+            index, included, total = stack.pop()
+            if total >= target:
+                if total - target < best_excess:
+                    best, best_excess = included, total - target
+                    if best_excess == 0:
+                        break
+                continue
+            if index == len(values) or total + remaining[index] < target:
+                continue
+            # Exploring inclusion first finds solutions with fewer inputs sooner
+            stack.append((index + 1, included, total))
+            if total + values[index] <= target + cost_of_change:
+                stack.append((index + 1, included + [index], total + values[index]))
+        if best is None:
+            return None
+        return [candidates[index] for index in best]
+
+
+class Knapsack(CoinSelection):
+    """
+    Randomized subset search minimizing overpayment, like Bitcoin Core knapsack solver.
+
+    Uses a single UTXO if it matches the target or is the smallest one above it and
+    not worse than the best subset of smaller UTXO found in iterations random passes.
+    """
+
+    def __init__(
+        self, min_change: int = 1000, iterations: int = 1000, seed: int | None = None
+    ):
+        super().__init__(min_change)
+        self.iterations = iterations
+        self._random = random.Random(seed)
+
+    def _select(self, candidates, target, cost_of_change):
+        smaller = []
+        lowest_larger = None
+        for candidate in candidates:
+            if candidate[0] == target:
+                return [candidate]
+            if candidate[0] > target:
+                # Candidates are sorted descending, the last larger one is the lowest
+                lowest_larger = candidate
+            else:
+                smaller.append(candidate)
+
+        smaller_total = sum(value for value, _ in smaller)
+        if smaller_total == target:
+            return smaller
+        if smaller_total < target:
+            return [lowest_larger] if lowest_larger is not None else None
+
+        best, best_total = self._approximate_best_subset(smaller, target)
+        if lowest_larger is not None and lowest_larger[0] <= best_total:
+            return [lowest_larger]
+        return best
+
+    def _approximate_best_subset(self, candidates, target):
+        best = list(candidates)
+        best_total = sum(value for value, _ in candidates)
+        for _ in range(self.iterations):
+            if best_total == target:
+                break
+            included = [False] * len(candidates)
+            total = 0
+            reached = False
+            # Second pass adds everything not taken in the first one
+            for pass_number in range(2):
+                if reached:
+                    break
+                for index, (value, _) in enumerate(candidates):
+                    if included[index]:
+                        continue
+                    if pass_number == 0 and self._random.random() >= 0.5:
+                        continue
+                    included[index] = True
+                    total += value
+                    if total >= target:
+                        reached = True
+                        if total < best_total:
+                            best_total = total
+                            best = [
+                                candidate
+                                for candidate, chosen in zip(candidates, included)
+                                if chosen
+                            ]
+                        # Try to get closer to target without this one
+                        total -= value
+                        included[index] = False
+        return best, best_total
@@ -0,0 +1,27 @@
+import json
+from typing import Any
+
+# Fastest available backend is used, all of them accept bytes without decoding to str first
+try:
+    import orjson
+
+    def loads(data: bytes | str) -> Any:
+        return orjson.loads(data)
+
+    BACKEND = "orjson"
+except ImportError:
+    try:
+        import msgspec
+
+        _decoder = msgspec.json.Decoder()
+
+        def loads(data: bytes | str) -> Any:
+            return _decoder.decode(data)
+
+        BACKEND = "msgspec"
+    except ImportError:
+
+        def loads(data: bytes | str) -> Any:
+            return json.loads(data)
+
+        BACKEND = "json"
@@ -0,0 +1,112 @@
+import hashlib
+from collections.abc import Callable
+from decimal import Decimal
+
+from aiotx.exceptions import UnsupportedTransactionError
+
+COINBASE_TX_ID = bytes(32)
+COINBASE_VOUT = 0xFFFFFFFF
+
+
+def _double_sha256(data: bytes) -> bytes:
+    return hashlib.sha256(hashlib.sha256(data).digest()).digest()
+
+
+def _read_varint(data: bytes, offset: int) -> tuple[int, int]:
+    first = data[offset]
+    if first < 0xFD:
+        return first, offset + 1
+    size = {0xFD: 2, 0xFE: 4, 0xFF: 8}[first]
+    return (
+        int.from_bytes(data[offset + 1 : offset + 1 + size], "little"),
+        offset + 1 + size,
+    )
+
+
+def _parse_transaction(
+    data: bytes,
+    offset: int,
+    script_to_address: Callable[[bytes], str | None] | None,
+) -> tuple[dict, int]:
+    start = offset
+    # Marker 0 can't be a number of inputs, flag tells what extra data follows
+    flag = data[offset + 5] if data[offset + 4] == 0 else 0
+    offset += 6 if flag else 4
+    body_start = offset
+
+    input_count, offset = _read_varint(data, offset)
+    inputs = []
+    for _ in range(input_count):
+        prev_tx_id = data[offset : offset + 32]
+        vout = int.from_bytes(data[offset + 32 : offset + 36], "little")
+        script_length, offset = _read_varint(data, offset + 36)
+        if prev_tx_id == COINBASE_TX_ID and vout == COINBASE_VOUT:
+            inputs.append({"coinbase": data[offset : offset + script_length].hex()})
+        else:
+            inputs.append({"txid": prev_tx_id[::-1].hex(), "vout": vout})
+        # Script and sequence
+        offset += script_length + 4
+
+    output_count, offset = _read_varint(data, offset)
+    outputs = []
+    for n in range(output_count):
+        value = int.from_bytes(data[offset : offset + 8], "little")
+        script_length, offset = _read_varint(data, offset + 8)
+        script = data[offset : offset + script_length]
+        offset += script_length
+        script_pub_key = {"hex": script.hex()}
+        address = script_to_address(script) if script_to_address else None
+        if address is not None:
+            script_pub_key["address"] = address
+        outputs.append(
+            {"value": Decimal(value).scaleb(-8), "n": n, "scriptPubKey": script_pub_key}
+        )
+    body_end = offset
+
+    if flag & 1:
+        for _ in range(input_count):
+            item_count, offset = _read_varint(data, offset)
+            for _ in range(item_count):
+                item_length, offset = _read_varint(data, offset)
+                offset += item_length
+    if flag & 8:
+        # Litecoin MWEB: only HogEx transaction is allowed in a block, without MWEB part
+        if data[offset]:
+            raise UnsupportedTransactionError("MWEB transactions are not supported")
+        offset += 1
+    locktime = data[offset : offset + 4]
+    offset += 4
+
+    if flag:
+        # Transaction id doesn't cover marker, flag and witness
+        tx_id = _double_sha256(
+            data[start : start + 4] + data[body_start:body_end] + locktime
+        )
+    else:
+        tx_id = _double_sha256(data[start:offset])
+    return {"txid": tx_id[::-1].hex(), "vin": inputs, "vout": outputs}, offset
+
+
+def parse_block(
+    raw_block: bytes,
+    script_to_address: Callable[[bytes], str | None] | None = None,
+) -> dict:
+    """
+    Parse serialized block (getblock with verbosity 0) into a dict shaped like verbosity 2 result.
+
+    Only block hash, previous block hash and transaction ids, input outpoints and
+    output values, indexes and scripts are extracted. If script_to_address is given,
+    it is used to fill scriptPubKey address of outputs. Raises UnsupportedTransactionError
+    for Litecoin transactions with MWEB data.
+    """
+    header = raw_block[:80]
+    transaction_count, offset = _read_varint(raw_block, 80)
+    transactions = []
+    for _ in range(transaction_count):
+        transaction, offset = _parse_transaction(raw_block, offset, script_to_address)
+        transactions.append(transaction)
+    return {
+        "hash": _double_sha256(header)[::-1].hex(),
+        "previousblockhash": header[4:36][::-1].hex(),
+        "tx": transactions,
+    }
@@ -0,0 +1,34 @@
+import math
+
+# Weight units of segwit transaction parts, vsize is weight / 4 rounded up.
+# Version and locktime (4 bytes each), segwit marker and flag (witness data, 1 weight unit each).
+TX_OVERHEAD_WEIGHT = 4 * (4 + 4) + 2
+# Outpoint, empty script and sequence + witness: items count, signature (up to 72 bytes) and public key
+P2WPKH_INPUT_WEIGHT = 4 * (32 + 4 + 1 + 4) + (1 + 1 + 72 + 1 + 33)
+P2WPKH_SCRIPT_LENGTH = 22
+
+
+def varint_size(value: int) -> int:
+    if value < 0xFD:
+        return 1
+    if value <= 0xFFFF:
+        return 3
+    if value <= 0xFFFFFFFF:
+        return 5
+    return 9
+
+
+def output_weight(script_length: int = P2WPKH_SCRIPT_LENGTH) -> int:
+    # Value, script length and script
+    return 4 * (8 + varint_size(script_length) + script_length)
+
+
+def transaction_vsize(input_count: int, output_script_lengths: list[int]) -> int:
+    """Virtual size of a transaction spending P2WPKH inputs, signatures are assumed to be the longest possible."""
+    weight = (
+        TX_OVERHEAD_WEIGHT
+        + 4 * (varint_size(input_count) + varint_size(len(output_script_lengths)))
+        + input_count * P2WPKH_INPUT_WEIGHT
+        + sum(output_weight(length) for length in output_script_lengths)
+    )
+    return math.ceil(weight / 4)
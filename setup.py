@@ -29,6 +29,10 @@ extras_utxo = [
     "bitcoinlib==0.6.*",
 ]
 
+extras_fast_json = [
+    "orjson",
+]
+
 
 setup(
     name="aiotx",
@@ -66,6 +70,7 @@ setup(
         "test": extras_test,
         "utxo": extras_utxo,
         "evm": extras_evm,
+        "fast-json": extras_fast_json,
     },
     url="https://github.com/Grommash9/aiotx",
     project_urls={
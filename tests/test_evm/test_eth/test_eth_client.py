@@ -1,13 +1,18 @@
+import asyncio
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 from conftest import vcr_c
+from vcr.errors import CannotOverwriteExistingCassetteException
 
 from aiotx.clients import AioTxETHClient
 from aiotx.exceptions import (
     AioTxError,
     InvalidArgumentError,
+    NonceTooLowError,
     ReplacementTransactionUnderpriced,
+    RpcConnectionError,
     TransactionNotFound,
     WrongPrivateKey,
 )
@@ -33,6 +38,54 @@ async def test_get_chain_id(eth_client: AioTxETHClient):
     assert chain_id == 11155111
 
 
+@vcr_c.use_cassette("eth/get_chain_id.yaml")
+async def test_decode_json_in_thread(eth_client: AioTxETHClient):
+    # Every response is decoded in a thread
+    eth_client.json_thread_threshold = 0
+    assert await eth_client.get_chain_id() == 11155111
+    assert await eth_client._decode_json(b'{"value": 6.25002728}') == {
+        "value": 6.25002728
+    }
+
+
+@vcr_c.use_cassette("eth/get_chain_id.yaml")
+async def test_connection_pool_config():
+    client = AioTxETHClient("https://ethereum-sepolia-rpc.publicnode.com")
+    await client.connect(limit_per_host=5, total_timeout=20, read_timeout=10)
+    try:
+        assert client._session.connector.limit_per_host == 5
+        assert client._session.timeout.total == 20
+        assert client._session.timeout.sock_read == 10
+        assert await client.get_chain_id() == 11155111
+    finally:
+        await client.disconnect()
+
+
+async def test_read_timeout_while_reading_body():
+    stalled = asyncio.Event()
+
+    async def handle(reader, writer):
+        await reader.read(1024)
+        # Headers are sent, the body never comes
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 100\r\n\r\n{")
+        await writer.drain()
+        await stalled.wait()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    client = AioTxETHClient(f"http://127.0.0.1:{port}")
+    await client.connect(read_timeout=0.1)
+    try:
+        with pytest.raises(RpcConnectionError):
+            await client.get_chain_id()
+    finally:
+        stalled.set()
+        await client.disconnect()
+        server.close()
+        await server.wait_closed()
+
+
 @pytest.mark.parametrize(
     "wallet_address, expected_exception, expected_balance",
     [
@@ -58,6 +111,49 @@ async def test_get_balance(
         assert balance == expected_balance
 
 
+@vcr_c.use_cassette("eth/get_balances.yaml")
+async def test_get_balances(eth_client: AioTxETHClient):
+    balances = await eth_client.get_balances(
+        [
+            "0x56ebc43d764761bc09d5918787672e2c8d46da5f",
+            "0xf663792Be0EdD00AFFB8BBe4Ac6d8185efD5671d",
+            "0xC4BfcCb1668d6e464f33a76bAdD8c8d7d341E04B",
+        ]
+    )
+    assert balances == {
+        "0x56ebc43d764761bc09d5918787672e2c8d46da5f": 22243749149992258,
+        "0xf663792Be0EdD00AFFB8BBe4Ac6d8185efD5671d": 72596311066831845012,
+        "0xC4BfcCb1668d6e464f33a76bAdD8c8d7d341E04B": 0,
+    }
+
+    with pytest.raises(InvalidArgumentError):
+        await eth_client.get_balances(
+            [
+                "0x56ebc43d764761bc09d5918787672e2c8d46da5f",
+                "0x68EfbC84d1Eabc193979beab2E2DDc20B219A14",
+            ]
+        )
+
+
+@vcr_c.use_cassette("eth/get_balances.yaml")
+async def test_get_balance_with_request_coalescing(eth_client: AioTxETHClient):
+    eth_client.enable_request_coalescing()
+    balances = await asyncio.gather(
+        eth_client.get_balance("0x56ebc43d764761bc09d5918787672e2c8d46da5f"),
+        eth_client.get_balance("0xf663792Be0EdD00AFFB8BBe4Ac6d8185efD5671d"),
+        eth_client.get_balance("0xC4BfcCb1668d6e464f33a76bAdD8c8d7d341E04B"),
+    )
+    assert balances == [22243749149992258, 72596311066831845012, 0]
+
+    results = await asyncio.gather(
+        eth_client.get_balance("0x56ebc43d764761bc09d5918787672e2c8d46da5f"),
+        eth_client.get_balance("0x68EfbC84d1Eabc193979beab2E2DDc20B219A14"),
+        return_exceptions=True,
+    )
+    assert results[0] == 22243749149992258
+    assert isinstance(results[1], InvalidArgumentError)
+
+
 @pytest.mark.parametrize(
     "tx_id, expected_exception",
     [
@@ -158,6 +254,32 @@ async def test_get_gas_price(eth_client: AioTxETHClient):
     assert isinstance(result, int)
 
 
+@vcr_c.use_cassette("eth/get_gas_price.yaml")
+async def test_cached_gas_price(eth_client: AioTxETHClient):
+    # Cassette has one response, concurrent misses must share one call
+    results = await asyncio.gather(
+        *[eth_client._cached("get_gas_price") for _ in range(5)]
+    )
+    assert len(set(results)) == 1
+    assert await eth_client._cached("get_gas_price") == results[0]
+
+    eth_client.clear_cache()
+    with pytest.raises(CannotOverwriteExistingCassetteException):
+        await eth_client._cached("get_gas_price")
+
+
+@vcr_c.use_cassette("eth/get_chain_id.yaml")
+async def test_cached_chain_id(eth_client: AioTxETHClient):
+    assert await eth_client._cached("get_chain_id") == 11155111
+    assert await eth_client._cached("get_chain_id") == 11155111
+    assert eth_client._cache._values[("get_chain_id",)][0] is None
+
+    # Not cached with 0 ttl
+    eth_client.cache_ttl["get_chain_id"] = 0
+    with pytest.raises(CannotOverwriteExistingCassetteException):
+        await eth_client._cached("get_chain_id")
+
+
 @pytest.mark.parametrize(
     "private_key, to_address, amount, gas_price, gas_limit, expected_exception",
     [
@@ -532,3 +654,250 @@ async def test_send_transaction_with_auto_params(eth_client: AioTxETHClient):
         PRIVATE_KEY_TO_SEND_FROM, DESTINATION_ADDRESS, CONTRACT, wei_amount
     )
     assert isinstance(tx_id, str)
+
+
+@vcr_c.use_cassette("eth/endpoint_pool_failover.yaml", allow_playback_repeats=True)
+async def test_endpoint_pool_failover():
+    client = AioTxETHClient(
+        [
+            "https://eth-rpc-down.example.com",
+            "https://ethereum-sepolia-rpc.publicnode.com",
+        ]
+    )
+    await client.connect()
+    try:
+        for _ in range(4):
+            assert await client.get_chain_id() == 11155111
+    finally:
+        await client.disconnect()
+
+    down_endpoint, healthy_endpoint = client.endpoint_pool.endpoints
+    assert down_endpoint.ejected_until is not None
+    assert healthy_endpoint.ejected_until is None
+    assert healthy_endpoint.latency is not None
+
+
+async def test_endpoint_pool_probe_reset_on_unexpected_error():
+    client = AioTxETHClient(
+        ["https://eth-rpc-1.example.com", "https://eth-rpc-2.example.com"]
+    )
+    await client.connect()
+
+    async def send_request(method, url, **kwargs):
+        raise ValueError("unexpected")
+
+    client._send_request = send_request
+    ejected = client.endpoint_pool.endpoints[0]
+    ejected.ejected_until = 0
+    tried = []
+    try:
+        with pytest.raises(ValueError):
+            await client._make_pool_request("POST", "", tried)
+    finally:
+        await client.disconnect()
+    # Ejected endpoint was probed, next request can probe it again
+    assert tried == [ejected]
+    assert not ejected.probing
+
+
+def test_empty_node_url_list():
+    with pytest.raises(ValueError):
+        AioTxETHClient([])
+
+
+@vcr_c.use_cassette("eth/hedged_reads.yaml", allow_playback_repeats=True)
+async def test_hedged_reads():
+    client = AioTxETHClient(
+        ["https://eth-rpc-1.example.com", "https://eth-rpc-2.example.com"]
+    )
+    # Without latency samples initial delay is used, 0 hedges every read at once
+    client.enable_hedged_reads(initial_delay=0)
+    await client.connect()
+    try:
+        for _ in range(3):
+            assert await client.get_chain_id() == 11155111
+    finally:
+        await client.disconnect()
+
+    assert all(e.latency is not None for e in client.endpoint_pool.endpoints)
+
+    pool = client.endpoint_pool
+    pool._latencies.clear()
+    pool._latencies.extend(i / 100 for i in range(100))
+    assert pool.hedge_delay() == 0.95
+
+    client.disable_hedged_reads()
+    assert pool.hedge_percentile is None
+
+    with pytest.raises(ValueError):
+        AioTxETHClient("https://eth-rpc-1.example.com").enable_hedged_reads()
+
+
+async def test_nonce_manager(eth_client: AioTxETHClient):
+    requested = []
+
+    async def get_nonce(address):
+        requested.append(address)
+        await asyncio.sleep(0)
+        return 10
+
+    eth_client.enable_nonce_manager()
+    manager = eth_client.nonce_manager
+    manager._get_nonce = get_nonce
+    sender = "0xf9E35E4e1CbcF08E99B84d3f6FF662Ba4c306b5a"
+
+    acquired = await asyncio.gather(*[manager.acquire(sender) for _ in range(5)])
+    assert sorted(nonce for nonce, _ in acquired) == [10, 11, 12, 13, 14]
+    assert requested == [sender]
+
+    # Released gap is filled first, released top nonces are allocated again
+    manager.release(sender, 12, 0)
+    manager.release(sender, 14, 0)
+    assert await manager.acquire(sender.lower()) == (12, 0)
+    assert await manager.acquire(sender) == (14, 0)
+    assert await manager.acquire(sender) == (15, 0)
+
+    manager.resync(sender)
+    assert await manager.acquire(sender) == (10, 1)
+    assert requested == [sender, sender]
+
+
+async def test_nonce_manager_release_after_resync(eth_client: AioTxETHClient):
+    async def get_nonce(address):
+        return 10
+
+    eth_client.enable_nonce_manager()
+    manager = eth_client.nonce_manager
+    manager._get_nonce = get_nonce
+    sender = "0xf9E35E4e1CbcF08E99B84d3f6FF662Ba4c306b5a"
+
+    stale = [await manager.acquire(sender) for _ in range(2)]
+    manager.resync()
+    assert await manager.acquire(sender) == (10, 1)
+    # Nonces from before resync may be in use, releasing them doesn't hand them out
+    for nonce, generation in stale:
+        manager.release(sender, nonce, generation)
+    assert await manager.acquire(sender) == (11, 1)
+
+
+def _stub_rpc_calls(eth_client: AioTxETHClient, send_results: list) -> list[int]:
+    """Answer pending count and broadcasts without the node, returns broadcast nonces."""
+    import rlp
+
+    nonce_requests = iter(["0x5", "0x6"])
+    sent_nonces = []
+    send_results = iter(send_results)
+
+    def send_raw_transaction(raw_tx):
+        sent_nonces.append(int.from_bytes(rlp.decode(bytes.fromhex(raw_tx[2:]))[0]))
+        return next(send_results)
+
+    async def make_rpc_call(payload):
+        if payload["method"] == "eth_getTransactionCount":
+            return next(nonce_requests)
+        result = send_raw_transaction(payload["params"][0])
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def make_batch_rpc_call(payloads, return_exceptions=False):
+        return [send_raw_transaction(payload["params"][0]) for payload in payloads]
+
+    eth_client._make_rpc_call = make_rpc_call
+    eth_client._make_batch_rpc_call = make_batch_rpc_call
+    return sent_nonces
+
+
+async def test_send_with_nonce_manager(eth_client: AioTxETHClient):
+    eth_client.enable_nonce_manager()
+    eth_client.chain_id = 11155111
+    sent_nonces = _stub_rpc_calls(
+        eth_client,
+        [
+            NonceTooLowError("nonce too low: next nonce 6, tx nonce 5"),
+            "0x" + "ab" * 32,
+            AioTxError("insufficient funds for gas * price + value"),
+            "0x" + "cd" * 32,
+        ],
+    )
+    # Pending count is 5 but nonce 5 is already used by a transaction from elsewhere
+    with pytest.raises(NonceTooLowError):
+        await eth_client.send(PRIVATE_KEY_TO_SEND_FROM, DESTINATION_ADDRESS, 1, None, 5)
+    # Resynced from the node
+    tx_id = await eth_client.send(
+        PRIVATE_KEY_TO_SEND_FROM, DESTINATION_ADDRESS, 1, None, 5
+    )
+    assert tx_id == "0x" + "ab" * 32
+    # Failed broadcast releases its nonce for the next transaction
+    with pytest.raises(AioTxError):
+        await eth_client.send(PRIVATE_KEY_TO_SEND_FROM, DESTINATION_ADDRESS, 1, None, 5)
+    tx_id = await eth_client.send(
+        PRIVATE_KEY_TO_SEND_FROM, DESTINATION_ADDRESS, 1, None, 5
+    )
+    assert tx_id == "0x" + "cd" * 32
+    assert sent_nonces == [5, 6, 7, 7]
+
+
+async def test_send_bulk(eth_client: AioTxETHClient):
+    eth_client.enable_nonce_manager()
+    eth_client.chain_id = 11155111
+    sent_nonces = _stub_rpc_calls(
+        eth_client,
+        [
+            "0x" + "01" * 32,
+            AioTxError("insufficient funds for gas * price + value"),
+            "0x" + "03" * 32,
+            "0x" + "04" * 32,
+        ],
+    )
+    with ThreadPoolExecutor(2) as executor:
+        results = await eth_client.send_bulk(
+            PRIVATE_KEY_TO_SEND_FROM,
+            [
+                (DESTINATION_ADDRESS, 1),
+                (DESTINATION_ADDRESS, 2),
+                (DESTINATION_ADDRESS, 3),
+            ],
+            gas_price=5,
+            executor=executor,
+        )
+    assert results[0] == "0x" + "01" * 32
+    assert isinstance(results[1], AioTxError)
+    assert results[2] == "0x" + "03" * 32
+
+    # Nonce of the failed transaction is used by the next one
+    results = await eth_client.send_token_bulk(
+        PRIVATE_KEY_TO_SEND_FROM, CONTRACT, [(DESTINATION_ADDRESS, 10)], gas_price=5
+    )
+    assert results == ["0x" + "04" * 32]
+    assert sent_nonces == [5, 6, 7, 6]
+
+
+async def test_send_bulk_chunk_failed(eth_client: AioTxETHClient):
+    eth_client.enable_nonce_manager()
+    eth_client.chain_id = 11155111
+    eth_client.max_batch_size = 2
+
+    async def make_rpc_call(payload):
+        return "0x5"
+
+    async def send_rpc_batch(payloads):
+        if payloads[0]["id"] == 2:
+            raise RpcConnectionError("Request timed out")
+        return [
+            {"jsonrpc": "2.0", "id": payload["id"], "result": "0x" + "01" * 32}
+            for payload in payloads
+        ]
+
+    eth_client._make_rpc_call = make_rpc_call
+    eth_client._send_rpc_batch = send_rpc_batch
+    results = await eth_client.send_bulk(
+        PRIVATE_KEY_TO_SEND_FROM,
+        [(DESTINATION_ADDRESS, 1), (DESTINATION_ADDRESS, 2), (DESTINATION_ADDRESS, 3)],
+        gas_price=5,
+    )
+    # First chunk is broadcast, its hashes are kept
+    assert results[:2] == ["0x" + "01" * 32] * 2
+    assert isinstance(results[2], RpcConnectionError)
+    # Failed chunk may be broadcast too, its nonce is not reused
+    assert eth_client.nonce_manager._next_nonce == {}
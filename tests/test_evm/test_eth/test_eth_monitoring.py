@@ -3,6 +3,8 @@ import asyncio
 from conftest import vcr_c
 
 from aiotx.clients import AioTxBSCClient
+from aiotx.utils.bloom_filter import BloomFilter
+from aiotx.utils.checkpoint_store import FileCheckpointStore, SQLiteCheckpointStore
 
 
 @vcr_c.use_cassette("tests/fixtures/cassettes/eth/test_async_monitoring.yaml")
@@ -53,3 +55,223 @@ async def test_async_monitoring(eth_client: AioTxBSCClient):
 
     for tx in block_transactions_list[0]:
         assert "aiotx_decoded_input" in tx.keys()
+
+
+@vcr_c.use_cassette(
+    "tests/fixtures/cassettes/eth/monitoring_catch_up.yaml",
+    allow_playback_repeats=True,
+)
+async def test_monitoring_catch_up(eth_client: AioTxBSCClient):
+    blocks = []
+    transactions = []
+
+    @eth_client.monitor.on_block
+    async def handle_block(block, latest_block):
+        blocks.append(block)
+
+    @eth_client.monitor.on_transaction
+    async def handle_transaction(transaction):
+        transactions.append(transaction)
+
+    monitoring_task = asyncio.create_task(
+        eth_client.start_monitoring(2834064, catch_up_window=2)
+    )
+    await asyncio.sleep(0.5)
+    eth_client.stop_monitoring()
+    await monitoring_task
+
+    # Fetched as two batches, second one while the first was handled
+    assert blocks == [2834064, 2834065, 2834066]
+    assert eth_client.monitor._latest_block == 2834067
+    assert "0x5b6fd8fda590e887531df12dec5faf2ce8c94a3eeb56bcc1fde760fabd64e56e" in [
+        tx["hash"] for tx in transactions
+    ]
+
+
+@vcr_c.use_cassette(
+    "tests/fixtures/cassettes/eth/monitoring_catch_up.yaml",
+    allow_playback_repeats=True,
+)
+async def test_monitoring_confirmations(eth_client: AioTxBSCClient):
+    blocks = []
+    seen_blocks = []
+
+    @eth_client.monitor.on_block
+    async def handle_block(block, latest_block):
+        blocks.append(block)
+
+    @eth_client.monitor.on_block_seen
+    async def handle_block_seen(block_number, block):
+        assert int(block["number"], 16) == block_number
+        seen_blocks.append(block_number)
+
+    monitoring_task = asyncio.create_task(
+        eth_client.start_monitoring(2834064, catch_up_window=2, confirmations=2)
+    )
+    await asyncio.sleep(0.5)
+    eth_client.stop_monitoring()
+    await monitoring_task
+
+    # Network head is 2834066, it has only one confirmation
+    assert seen_blocks == [2834064, 2834065, 2834066]
+    assert blocks == [2834064, 2834065]
+    assert eth_client.monitor._checkpoint_state() == {"block": 2834066}
+
+
+def test_head_backoff_uses_observed_block_time(eth_client: AioTxBSCClient):
+    monitor = eth_client.monitor
+    monitor._reset_block_time()
+    assert monitor._head_backoff(1) == 1
+
+    monitor._observe_network_head(100)
+    # Pretend head was seen 24 seconds ago, two blocks later block time is 12s
+    monitor._network_head_seen_at -= 24
+    monitor._observe_network_head(102)
+    assert 11.9 < monitor._block_time < 12.1
+    # Just saw a new block, next one is expected in ~12 seconds
+    assert 11 < monitor._head_backoff(1) <= 12.1
+    # Block is overdue, poll with the configured timeout
+    monitor._network_head_seen_at -= 60
+    assert monitor._head_backoff(1) == 1
+
+
+async def test_concurrent_transaction_handlers(eth_client: AioTxBSCClient):
+    monitor = eth_client.monitor
+    monitor.handler_concurrency = 2
+    monitor.keep_address_order = True
+    running = 0
+    max_running = 0
+    handled = []
+
+    @monitor.on_transaction
+    async def handle_transaction(transaction):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        # First transactions are the slowest ones
+        await asyncio.sleep(0.01 * (5 - transaction["nonce"]))
+        handled.append((transaction["from"], transaction["nonce"]))
+        running -= 1
+
+    transactions = [
+        {"from": address, "nonce": nonce} for nonce in range(3) for address in "abc"
+    ]
+    await monitor._dispatch_transactions(transactions)
+
+    assert len(handled) == len(transactions)
+    assert max_running == 2
+    for address in "abc":
+        assert [n for a, n in handled if a == address] == [0, 1, 2]
+
+
+@vcr_c.use_cassette(
+    "tests/fixtures/cassettes/eth/monitoring_catch_up.yaml",
+    allow_playback_repeats=True,
+)
+async def test_monitoring_checkpoint(eth_client: AioTxBSCClient, tmp_path):
+    store = FileCheckpointStore(str(tmp_path / "checkpoints.json"))
+    blocks = []
+
+    @eth_client.monitor.on_block
+    async def handle_block(block, latest_block):
+        blocks.append(block)
+
+    monitoring_task = asyncio.create_task(
+        eth_client.start_monitoring(2834064, catch_up_window=2, checkpoint_store=store)
+    )
+    await asyncio.sleep(0.5)
+    eth_client.stop_monitoring()
+    await monitoring_task
+
+    assert blocks == [2834064, 2834065, 2834066]
+    # Saved on shutdown, even though less than checkpoint_every_blocks were processed
+    assert await store.load("AioTxETHClient") == {"block": 2834067}
+
+    await store.save("AioTxETHClient", {"block": 2834066})
+    monitoring_task = asyncio.create_task(
+        eth_client.start_monitoring(checkpoint_store=store)
+    )
+    await asyncio.sleep(0.5)
+    eth_client.stop_monitoring()
+    await monitoring_task
+
+    # Restarted from checkpoint instead of network head
+    assert blocks == [2834064, 2834065, 2834066, 2834066]
+
+
+async def test_sqlite_checkpoint_store(tmp_path):
+    store = SQLiteCheckpointStore(str(tmp_path / "checkpoints.db"))
+    assert await store.load("ton") is None
+    await store.save("ton", {"block": 1, "shards": [[0, "8000000000000000", 5]]})
+    await store.save("ton", {"block": 2, "shards": [[0, "8000000000000000", 7]]})
+    await store.close()
+
+    store = SQLiteCheckpointStore(str(tmp_path / "checkpoints.db"))
+    assert await store.load("ton") == {
+        "block": 2,
+        "shards": [[0, "8000000000000000", 7]],
+    }
+    await store.close()
+
+
+@vcr_c.use_cassette(
+    "tests/fixtures/cassettes/eth/monitoring_catch_up.yaml",
+    allow_playback_repeats=True,
+)
+async def test_monitoring_address_filter(eth_client: AioTxBSCClient):
+    transactions = []
+    address_filter = BloomFilter(1000)
+    address_filter.add("0x91b126ff9af242408090a223829eb88a61724aa5")
+    eth_client.monitor.address_filter = address_filter
+
+    @eth_client.monitor.on_transaction
+    async def handle_transaction(transaction):
+        transactions.append(transaction)
+
+    monitoring_task = asyncio.create_task(
+        eth_client.start_monitoring(2834064, catch_up_window=2)
+    )
+    await asyncio.sleep(0.5)
+    eth_client.stop_monitoring()
+    await monitoring_task
+
+    assert [tx["hash"] for tx in transactions] == [
+        "0x5b6fd8fda590e887531df12dec5faf2ce8c94a3eeb56bcc1fde760fabd64e56e"
+    ]
+
+
+def test_bloom_filter():
+    addresses = [f"0x{i:040x}" for i in range(10000)]
+    address_filter = BloomFilter(10000, error_rate=0.01)
+    address_filter.update(addresses)
+
+    assert len(address_filter) == 10000
+    assert all(address in address_filter for address in addresses)
+    false_positives = sum(f"0x{i:040x}" in address_filter for i in range(10000, 20000))
+    assert false_positives < 200
+    # ~9.6 bits per address
+    assert len(address_filter._bits) < 13000
+
+
+@vcr_c.use_cassette("tests/fixtures/cassettes/eth/monitoring_reorg.yaml")
+async def test_monitoring_reorg(eth_client: AioTxBSCClient):
+    blocks = []
+    rollbacks = []
+
+    @eth_client.monitor.on_block
+    async def handle_block(block, latest_block):
+        blocks.append(block)
+
+    @eth_client.monitor.on_rollback
+    async def handle_rollback(block_number):
+        rollbacks.append(block_number)
+
+    monitoring_task = asyncio.create_task(eth_client.start_monitoring(100))
+    await asyncio.sleep(0.5)
+    eth_client.stop_monitoring()
+    await monitoring_task
+
+    # Block 101 was replaced, it is delivered again from the new chain
+    assert rollbacks == [101]
+    assert blocks == [100, 101, 101, 102]
+    assert eth_client.monitor._latest_block == 103
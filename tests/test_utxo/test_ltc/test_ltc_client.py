@@ -4,9 +4,18 @@ import sys
 
 import pytest
 from conftest import vcr_c
+from vcr.errors import CannotOverwriteExistingCassetteException
 
 from aiotx.clients import AioTxLTCClient
 from aiotx.exceptions import InsufficientFunds, NotImplementedError, RpcConnectionError
+from aiotx.types import FeeEstimate, UTXOType
+from aiotx.utils.coin_selection import (
+    BranchAndBound,
+    Consolidation,
+    Knapsack,
+    LargestFirst,
+)
+from aiotx.utils.tx_size import transaction_vsize
 
 TEST_LTC_WALLET_PRIVATE_KEY = os.getenv("TEST_LTC_WALLET_PRIVATE_KEY")
 assert TEST_LTC_WALLET_PRIVATE_KEY is not None, "add TEST_LTC_WALLET_PRIVATE_KEY"
@@ -19,6 +28,21 @@ async def test_get_last_block(ltc_public_client: AioTxLTCClient):
     assert isinstance(block_id, int)
 
 
+@vcr_c.use_cassette("ltc/get_block_by_number.yaml")
+async def test_get_block_by_number_with_shared_session(
+    ltc_public_client: AioTxLTCClient,
+):
+    await ltc_public_client.connect(limit=10, keepalive_timeout=30)
+    try:
+        session = ltc_public_client._session
+        block = await ltc_public_client.get_block_by_number(3247846)
+        assert isinstance(block, dict)
+        assert ltc_public_client._session is session
+        assert session.connector.limit == 10
+    finally:
+        await ltc_public_client.disconnect()
+
+
 @vcr_c.use_cassette("ltc/get_block_by_number.yaml")
 async def test_get_block_by_number(ltc_public_client: AioTxLTCClient):
     block = await ltc_public_client.get_block_by_number(3247846)
@@ -633,3 +657,305 @@ async def test_get_raw_transaction(
         tx_data = await ltc_public_client.get_raw_transaction(tx_id)
         assert isinstance(tx_data, dict)
         assert "txid" in tx_data.keys()
+
+
+async def test_apply_block_changes(ltc_public_client: AioTxLTCClient):
+    monitor = ltc_public_client.monitor
+    first_tx_id = "55863cc61de0c6c1c87282d3d6fb03650c0fc90ed3282191c618069cbde1d525"
+    second_tx_id = "a006aedf3a08f423434aa781988997a0526f9365fe228fb8934ea64bbbb9d055"
+    await monitor._add_new_utxo(TEST_LTC_ADDRESS, first_tx_id, 39000000, 0)
+    await monitor._mark_utxo_used(first_tx_id, 0)
+
+    await monitor._apply_block_changes(
+        101,
+        [
+            (TEST_LTC_ADDRESS, first_tx_id, 39000000, 0),
+            (TEST_LTC_ADDRESS, second_tx_id, 10000000, 0),
+            (TEST_LTC_ADDRESS, second_tx_id, 28500000, 1),
+        ],
+        [(second_tx_id, 0)],
+    )
+
+    # Existing UTXO is marked unspent again, UTXO created and spent in the same block is gone
+    utxo_list = await monitor._get_utxo_data(TEST_LTC_ADDRESS)
+    assert sorted((utxo.tx_id, utxo.output_n) for utxo in utxo_list) == [
+        (first_tx_id, 0),
+        (second_tx_id, 1),
+    ]
+    assert await monitor._get_last_block() == 101
+
+    await monitor._apply_block_changes(102, [], [(first_tx_id, 0), (second_tx_id, 1)])
+    assert await monitor._get_utxo_data(TEST_LTC_ADDRESS) == []
+    assert await monitor._get_last_block() == 102
+
+
+async def test_process_blocks_cancelled_in_handler(ltc_public_client: AioTxLTCClient):
+    monitor = ltc_public_client.monitor
+    tx_id = "55863cc61de0c6c1c87282d3d6fb03650c0fc90ed3282191c618069cbde1d525"
+    async with monitor._session() as session, session.begin():
+        session.add(monitor.Address(address=TEST_LTC_ADDRESS, block_number=1))
+    await monitor._init_last_block(100)
+    block = {
+        "tx": [
+            {
+                "txid": tx_id,
+                "vin": [],
+                "vout": [
+                    {
+                        "value": 0.39,
+                        "n": 0,
+                        "scriptPubKey": {"address": TEST_LTC_ADDRESS},
+                    }
+                ],
+            }
+        ]
+    }
+    handled = []
+
+    @monitor.on_new_utxo_transaction
+    async def handle_deposit(transaction):
+        if not handled:
+            handled.append(None)
+            # Monitoring is stopped while the handler is busy
+            raise asyncio.CancelledError
+        handled.append(transaction["txid"])
+
+    with pytest.raises(asyncio.CancelledError):
+        await monitor.process_blocks([(100, block)])
+    # UTXO is stored, but the block is processed again after restart
+    assert await monitor._get_last_block() == 100
+    assert len(await monitor._get_utxo_data(TEST_LTC_ADDRESS)) == 1
+
+    await monitor.process_blocks([(100, block)])
+    assert handled == [None, tx_id]
+    assert await monitor._get_last_block() == 101
+    assert len(await monitor._get_utxo_data(TEST_LTC_ADDRESS)) == 1
+
+
+async def test_rollback_block_changes(ltc_public_client: AioTxLTCClient):
+    monitor = ltc_public_client.monitor
+    first_tx_id = "55863cc61de0c6c1c87282d3d6fb03650c0fc90ed3282191c618069cbde1d525"
+    second_tx_id = "a006aedf3a08f423434aa781988997a0526f9365fe228fb8934ea64bbbb9d055"
+    await monitor._add_new_utxo(TEST_LTC_ADDRESS, first_tx_id, 39000000, 0)
+
+    # Block 101 spends the first UTXO and creates the second one
+    deleted_rows = await monitor._apply_block_changes(
+        102,
+        [(TEST_LTC_ADDRESS, second_tx_id, 10000000, 0)],
+        [(first_tx_id, 0)],
+    )
+    monitor._add_to_journal(
+        {101: ([(second_tx_id, 0)], [(first_tx_id, 0)])}, deleted_rows
+    )
+    utxo_list = await monitor._get_utxo_data(TEST_LTC_ADDRESS)
+    assert [(utxo.tx_id, utxo.output_n) for utxo in utxo_list] == [(second_tx_id, 0)]
+
+    await monitor._rollback(101)
+    utxo_list = await monitor._get_utxo_data(TEST_LTC_ADDRESS)
+    assert [(utxo.tx_id, utxo.amount_satoshi) for utxo in utxo_list] == [
+        (first_tx_id, 39000000)
+    ]
+    assert await monitor._get_last_block() == 101
+    assert len(monitor._journal) == 0
+
+
+def test_address_to_script(ltc_public_client: AioTxLTCClient):
+    for script in (
+        "00147bd19b7434e4d9c93c534621c23c5eba8a35c187",
+        "76a914684a4a9d1c027eddb12029e40ccd86215360790a88ac",
+        "a914684a4a9d1c027eddb12029e40ccd86215360790a87",
+        "512079be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798",
+    ):
+        address = ltc_public_client._script_to_address(bytes.fromhex(script))
+        assert ltc_public_client._address_to_script(address).hex() == script
+    assert ltc_public_client._address_to_script("not an address") is None
+
+
+async def test_outpoint_index(ltc_public_client: AioTxLTCClient):
+    monitor = ltc_public_client.monitor
+    tx_id = "55863cc61de0c6c1c87282d3d6fb03650c0fc90ed3282191c618069cbde1d525"
+    key = monitor._outpoint_key
+    assert len(key(tx_id, 1)) == 36
+    assert await monitor._get_outpoint_index() == set()
+
+    await monitor._add_new_utxo(TEST_LTC_ADDRESS, tx_id, 39000000, 0)
+    await monitor._add_new_utxo(TEST_LTC_ADDRESS, tx_id, 1000000, 1)
+    assert await monitor._get_outpoint_index() == {key(tx_id, 0), key(tx_id, 1)}
+
+    await monitor._apply_block_changes(101, [], [(tx_id, 0)])
+    assert await monitor._get_outpoint_index() == {key(tx_id, 1)}
+
+    await monitor._delete_utxo(tx_id, 1)
+    assert await monitor._get_outpoint_index() == set()
+
+    # Changed not through the monitor, visible only after invalidation
+    async with monitor._session() as session, session.begin():
+        session.add(
+            monitor.UTXO(
+                address=TEST_LTC_ADDRESS,
+                tx_id=tx_id,
+                amount_satoshi=500,
+                output_n=2,
+            )
+        )
+    assert await monitor._get_outpoint_index() == set()
+    monitor.invalidate_index()
+    assert await monitor._get_outpoint_index() == {key(tx_id, 2)}
+
+
+async def test_address_filter(ltc_public_client: AioTxLTCClient):
+    monitor = ltc_public_client.monitor
+    other_address = "tltc1q24gng65qj3wr55878324w2eeeta4k2plfwaf54"
+    async with monitor._session() as session, session.begin():
+        session.add(monitor.Address(address=TEST_LTC_ADDRESS, block_number=1))
+
+    monitor.enable_address_filter(1000)
+    assert await monitor._get_watched_addresses({TEST_LTC_ADDRESS, other_address}) == {
+        TEST_LTC_ADDRESS
+    }
+    assert monitor._address_index is None
+    assert TEST_LTC_ADDRESS in monitor._address_filter
+
+
+def _utxo_list(*amounts):
+    return [
+        UTXOType(f"{i + 1:064x}", 0, TEST_LTC_ADDRESS, amount, False)
+        for i, amount in enumerate(amounts)
+    ]
+
+
+def test_coin_selection():
+    utxo_list = _utxo_list(10000, 500000, 73000, 250000, 300)
+    # 1 sat/vbyte: inputs cost 68 each, transaction with one output 42
+    result = BranchAndBound().select(utxo_list, 250000 - 68 - 42, 1)
+    assert [utxo.amount_satoshi for utxo in result.utxo_list] == [250000]
+    assert (result.fee, result.change) == (110, 0)
+
+    # Fee is paid by the recipient, dust change left over is paid to the miner
+    result = BranchAndBound().select(utxo_list, 249500, 1, subtract_fee=True)
+    assert [utxo.amount_satoshi for utxo in result.utxo_list] == [250000]
+    assert (result.fee, result.change) == (110 + 500, 0)
+
+    result = LargestFirst().select(utxo_list, 600000, 1)
+    assert [utxo.amount_satoshi for utxo in result.utxo_list] == [500000, 250000]
+    assert result.fee == 42 + 2 * 68 + 31
+    assert result.change == 750000 - 600000 - result.fee
+
+    # No changeless set, falls back to knapsack which picks the closest single UTXO
+    result = BranchAndBound(fallback=Knapsack(seed=1)).select(utxo_list, 60000, 1)
+    assert [utxo.amount_satoshi for utxo in result.utxo_list] == [73000]
+
+    # At 5 sat/vbyte 300 satoshi UTXO costs more than it's worth, it's not spent
+    result = Consolidation().select(utxo_list, 1000, 5)
+    assert sorted(utxo.amount_satoshi for utxo in result.utxo_list) == [
+        10000,
+        73000,
+        250000,
+        500000,
+    ]
+
+    with pytest.raises(InsufficientFunds):
+        LargestFirst().select(utxo_list, 1000000, 1)
+
+
+async def test_create_transaction_with_coin_selection(
+    ltc_public_client: AioTxLTCClient,
+):
+    ltc_public_client.coin_selection = BranchAndBound()
+    utxo_list = _utxo_list(10000, 500000, 73000, 250000)
+    destinations = {TEST_LTC_ADDRESS: 200000}
+    inputs, fee, change = await ltc_public_client._select_coins(
+        destinations, utxo_list, 6, FeeEstimate.CONSERVATIVE, None, 2, False
+    )
+    assert [utxo.amount_satoshi for utxo in inputs] == [250000]
+    _, inputs_used, outputs = await ltc_public_client._create_transaction(
+        destinations,
+        inputs,
+        TEST_LTC_ADDRESS,
+        fee,
+        False,
+        use_all_inputs=True,
+        change=change,
+    )
+    assert inputs_used == [(utxo_list[3].tx_id, 0, 250000)]
+    assert sum(amount for _, amount in outputs) == 250000 - fee
+
+
+async def test_create_transaction_deduct_fee_with_dust_change(
+    ltc_public_client: AioTxLTCClient,
+):
+    ltc_public_client.coin_selection = BranchAndBound()
+    utxo_list = _utxo_list(10000, 500000, 73000, 250000)
+    destinations = {TEST_LTC_ADDRESS: 249500}
+    inputs, fee, change = await ltc_public_client._select_coins(
+        destinations, utxo_list, 6, FeeEstimate.CONSERVATIVE, 1000, None, True
+    )
+    assert [utxo.amount_satoshi for utxo in inputs] == [250000]
+    assert (fee, change) == (1500, 0)
+    _, _, outputs = await ltc_public_client._create_transaction(
+        destinations,
+        inputs,
+        TEST_LTC_ADDRESS,
+        fee,
+        True,
+        use_all_inputs=True,
+        change=change,
+    )
+    # No dust change output, recipient pays only the part of the fee not covered by it
+    assert outputs == [(TEST_LTC_ADDRESS, 249500 - 1000)]
+
+
+def test_transaction_vsize():
+    assert transaction_vsize(1, [22, 22]) == 141
+    assert transaction_vsize(2, [22, 22]) == 209
+    # Legacy P2PKH output script is 25 bytes long
+    assert transaction_vsize(2, [22, 25]) == 212
+
+
+@pytest.mark.skipif(
+    sys.platform == "win32",
+    reason="Skipping transaction signing tests on Windows because we are not using RFC6979 from fastecdsa by default",
+)
+async def test_estimate_total_fee(ltc_public_client: AioTxLTCClient):
+    utxo_list = _utxo_list(10000, 500000, 73000)
+    for destinations in (
+        {TEST_LTC_ADDRESS: 400000},
+        {TEST_LTC_ADDRESS: 400000, "mq2PZs9p5ZNLbu23KLKb1tdQt1mrBJM7CX": 1000},
+    ):
+        fee = await ltc_public_client._estimate_total_fee(
+            destinations,
+            6,
+            FeeEstimate.CONSERVATIVE,
+            10,
+            utxo_list,
+            TEST_LTC_ADDRESS,
+            False,
+        )
+        # Same fee as for the signed transaction
+        transaction, _, _ = await ltc_public_client._create_transaction(
+            destinations, utxo_list, TEST_LTC_ADDRESS, fee, False
+        )
+        transaction.fee_per_kb = 10 * 1024
+        transaction = ltc_public_client._sign_transaction(
+            transaction, [TEST_LTC_WALLET_PRIVATE_KEY]
+        )
+        transaction.estimate_size()
+        assert fee == transaction.calculate_fee()
+
+
+@vcr_c.use_cassette("ltc/estimate_smart_fee_cache.yaml")
+async def test_estimate_smart_fee_cache(ltc_public_client: AioTxLTCClient):
+    # Cassette has one response per conf_target, repeated call must be cached
+    for _ in range(2):
+        assert (
+            await ltc_public_client._get_fee_per_kb(6, FeeEstimate.CONSERVATIVE, None)
+            == 1985
+        )
+    assert (
+        await ltc_public_client._get_fee_per_kb(2, FeeEstimate.CONSERVATIVE, None)
+        == 2500
+    )
+
+    ltc_public_client.clear_cache()
+    with pytest.raises(CannotOverwriteExistingCassetteException):
+        await ltc_public_client._get_fee_per_kb(6, FeeEstimate.CONSERVATIVE, None)
@@ -51,3 +51,148 @@ async def test_async_monitoring(ltc_public_client: AioTxLTCClient):
     assert "992b887a10aa924430e905174535fd92733136b76d39e835c109e3ff2719bd69" in [
         tx["txid"] for tx in block_transactions_list[1]
     ]
+
+
+@vcr_c.use_cassette(
+    "tests/fixtures/cassettes/ltc/monitoring_catch_up.yaml",
+    allow_playback_repeats=True,
+)
+async def test_monitoring_catch_up(ltc_public_client: AioTxLTCClient):
+    blocks = []
+    transactions = []
+
+    @ltc_public_client.monitor.on_block
+    async def handle_block(block):
+        blocks.append(block)
+
+    @ltc_public_client.monitor.on_transaction
+    async def handle_transaction(transaction):
+        transactions.append(transaction)
+
+    await ltc_public_client.import_address(
+        "tltc1qsawz44ppfnxmnat7635f83exgf9mynrzs5tsgl", 3247853
+    )
+    monitoring_task = asyncio.create_task(
+        ltc_public_client.start_monitoring(catch_up_window=2)
+    )
+    await asyncio.sleep(1)
+    ltc_public_client.stop_monitoring()
+    await monitoring_task
+
+    # Two windows, hashes batched and blocks fetched concurrently, handled in order
+    assert blocks == [3247853, 3247854, 3247855]
+    assert "992b887a10aa924430e905174535fd92733136b76d39e835c109e3ff2719bd69" in [
+        tx["txid"] for tx in transactions
+    ]
+    assert await ltc_public_client.monitor._get_last_block() == 3247856
+
+
+@vcr_c.use_cassette(
+    "tests/fixtures/cassettes/ltc/monitoring_catch_up.yaml",
+    allow_playback_repeats=True,
+)
+async def test_monitoring_catch_up_cancelled_in_handler(
+    ltc_public_client: AioTxLTCClient,
+):
+    blocks = []
+
+    @ltc_public_client.monitor.on_block
+    async def handle_block(block):
+        blocks.append(block)
+        if block == 3247854 and blocks.count(block) == 1:
+            # Monitoring is stopped while the handler is busy in the middle of the window
+            ltc_public_client.stop_monitoring()
+            await asyncio.sleep(1)
+
+    await ltc_public_client.import_address(
+        "tltc1qsawz44ppfnxmnat7635f83exgf9mynrzs5tsgl", 3247853
+    )
+    await ltc_public_client.start_monitoring(catch_up_window=2)
+    assert blocks == [3247853, 3247854]
+    assert await ltc_public_client.monitor._get_last_block() == 3247854
+
+    # Unfinished rest of the window is processed again after restart
+    monitoring_task = asyncio.create_task(
+        ltc_public_client.start_monitoring(catch_up_window=2)
+    )
+    await asyncio.sleep(1)
+    ltc_public_client.stop_monitoring()
+    await monitoring_task
+    assert blocks == [3247853, 3247854, 3247854, 3247855]
+    assert await ltc_public_client.monitor._get_last_block() == 3247856
+
+
+@vcr_c.use_cassette(
+    "tests/fixtures/cassettes/ltc/monitoring_raw_blocks.yaml",
+    allow_playback_repeats=True,
+)
+async def test_monitoring_raw_blocks(ltc_public_client: AioTxLTCClient):
+    blocks = []
+    transactions = []
+
+    @ltc_public_client.monitor.on_block
+    async def handle_block(block):
+        blocks.append(block)
+
+    @ltc_public_client.monitor.on_transaction
+    async def handle_transaction(transaction):
+        transactions.append(transaction)
+
+    # Receives block 3247853 coinbase output
+    address = "tltc1q00gekap5unvuj0zngcsuy0z7h29rtsv8d6xwsj"
+    await ltc_public_client.import_address(address, 3247853)
+    monitoring_task = asyncio.create_task(
+        ltc_public_client.start_monitoring(catch_up_window=2, raw_blocks=True)
+    )
+    await asyncio.sleep(1)
+    ltc_public_client.stop_monitoring()
+    await monitoring_task
+
+    # Same blocks as in test_monitoring_catch_up, fetched serialized and parsed locally
+    assert blocks == [3247853, 3247854, 3247855]
+    assert "992b887a10aa924430e905174535fd92733136b76d39e835c109e3ff2719bd69" in [
+        tx["txid"] for tx in transactions
+    ]
+    assert await ltc_public_client.get_balance(address) == 625002728
+    assert await ltc_public_client.monitor._get_last_block() == 3247856
+
+
+@vcr_c.use_cassette("tests/fixtures/cassettes/ltc/monitoring_raw_block_mweb.yaml")
+async def test_raw_block_with_mweb_transaction(ltc_public_client: AioTxLTCClient):
+    monitor = ltc_public_client.monitor
+    monitor.raw_blocks = True
+    monitor.catch_up_window = 1
+    # Block 3247853 with MWEB data added to its HogEx transaction
+    [block] = await monitor._fetch_window(3247853, 3247853)
+    # Fetched again decoded by the node, local parser doesn't add height and ismweb
+    assert block["height"] == 3247853
+    assert block["tx"][0]["vout"][0]["ismweb"] is False
+
+
+@vcr_c.use_cassette(
+    "tests/fixtures/cassettes/ltc/monitoring_raw_blocks.yaml",
+    allow_playback_repeats=True,
+)
+async def test_monitoring_match_scripts(ltc_public_client: AioTxLTCClient):
+    new_utxo_transactions = []
+
+    @ltc_public_client.monitor.on_new_utxo_transaction
+    async def handle_new_utxo_transaction(transaction):
+        new_utxo_transactions.append(transaction)
+
+    address = "tltc1q00gekap5unvuj0zngcsuy0z7h29rtsv8d6xwsj"
+    await ltc_public_client.import_address(address, 3247853)
+    monitoring_task = asyncio.create_task(
+        ltc_public_client.start_monitoring(
+            catch_up_window=2, raw_blocks=True, match_scripts=True
+        )
+    )
+    await asyncio.sleep(1)
+    ltc_public_client.stop_monitoring()
+    await monitoring_task
+
+    assert await ltc_public_client.get_balance(address) == 625002728
+    # Only outputs to watched addresses get an address
+    outputs = new_utxo_transactions[0]["vout"]
+    assert outputs[0]["scriptPubKey"]["address"] == address
+    assert "address" not in outputs[1]["scriptPubKey"]